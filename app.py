@@ -1,5 +1,10 @@
 import pygame
 import os
+import io
+import json
+import struct
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 # --------------------------------------------------------------------------
 #                               CONSTANTS
@@ -7,20 +12,357 @@ import os
 
 WIDTH = 1200
 HEIGHT = 700
-FPS = 60
+FPS = 60                # Render rate cap
 
-PLAYER_SPEED = 3
-DEFAULT_ENEMY_SPEED = 1
+# The simulation advances in fixed ticks, independent of the render rate.
+# Speeds, cooldowns and timers are counted in ticks and tuned for 60/s;
+# speeds are multiplied by TICK_SCALE and durations go through ticks(),
+# so the game plays at the same pace whatever SIM_RATE is.
+SIM_RATE = 60
+TICK_SCALE = 60 / SIM_RATE
+MAX_CATCH_UP_STEPS = 5  # Ticks run at most per rendered frame
+
+def ticks(n):
+    """A duration of `n` ticks at 60/s, in ticks at SIM_RATE (at least 1)."""
+    return max(1, round(n / TICK_SCALE))
+
+PLAYER_SPEED = 3 * TICK_SCALE
+DEFAULT_ENEMY_SPEED = 1 * TICK_SCALE
 
 SPAWN_MARGIN = 50
+# Per-kind enemy stats (see enemy.ArchetypeRegistry)
+ENEMY_ARCHETYPES_PATH = os.path.join("assets", "enemies.json")
+# Relative odds of each enemy type in a regular spawn
+ENEMY_SPAWN_WEIGHTS = {"regular": 0.6, "flying": 0.25, "armored": 0.1, "boss": 0.05}
 
 ENEMY_SCALE_FACTOR = 3
 PLAYER_SCALE_FACTOR = 2
 FLOOR_TILE_SCALE_FACTOR = 2
 HEALTH_SCALE_FACTOR = 3
 
+GRID_CELL_SIZE = 64
+
+# The world scrolls with the player and has no edges. The floor is built
+# lazily in CHUNK_SIZE squares, at most CHUNK_CACHE_SIZE of them kept.
+CHUNK_SIZE = 256
+CHUNK_CACHE_SIZE = 64
+CULL_MARGIN = 256               # Slack around the view before sprites are skipped
+FAR_ENEMY_DISTANCE = 1000       # Enemies further from the player than this...
+FAR_ENEMY_UPDATE_INTERVAL = 4   # ...only animate every this many ticks
+
 PUSHBACK_DISTANCE = 80
-ENEMY_KNOCKBACK_SPEED = 5
+ENEMY_KNOCKBACK_SPEED = 5 * TICK_SCALE
+
+BULLET_SIZE = 10
+COIN_SIZE = 20
+MAX_COINS = 200             # Live coins at most; later drops add to existing ones
+COIN_MERGE_RADIUS = 40      # Drops this close to a coin add to its value
+COIN_MAGNET_RADIUS = 120    # Coins this close to the player are pulled in...
+COIN_MAGNET_SPEED = 6 * TICK_SCALE  # ...this many pixels per tick
+HOMING_BULLET_TINT = (100, 100, 255, 150)
+EXPLOSIVE_BULLET_TINT = (255, 100, 100, 150)
+
+# --------------------------------------------------------------------------
+#                           SHARED SURFACE CACHE
+# --------------------------------------------------------------------------
+
+def draw_bullet_fallback(size):
+    """Placeholder bullet used when bullet.png cannot be loaded."""
+    image = pygame.Surface(size, pygame.SRCALPHA)
+    w, h = size
+    pygame.draw.circle(image, (255, 255, 100), (w//2, h//2), w//2)
+    pygame.draw.circle(image, (255, 255, 255), (w//2, h//2), w//4)
+    return image
+
+def draw_coin_fallback(size):
+    """Placeholder coin used when coin.png cannot be loaded."""
+    image = pygame.Surface(size, pygame.SRCALPHA)
+    w, h = size
+    pygame.draw.circle(image, (255, 215, 0), (w//2, h//2), w//2)
+    pygame.draw.circle(image, (255, 255, 0), (w//2, h//2), w*3//10)
+    return image
+
+FALLBACK_IMAGES = {
+    "bullet.png": draw_bullet_fallback,
+    "coin.png": draw_coin_fallback,
+}
+
+class SurfaceCache:
+    """
+    Process-wide store of read-only surfaces keyed by (asset, size, tint).
+    Sprites share these surfaces instead of loading their own, so once
+    load_assets has warmed the cache creating a sprite costs no disk I/O.
+    Surfaces handed out must never be drawn on.
+    """
+    def __init__(self, folder="assets"):
+        self.folder = folder
+        self.surfaces = {}
+        self.originals = {}
+        self.hits = 0
+        self.misses = 0
+        self.disk_loads = 0
+
+    def original(self, asset):
+        """Return the unscaled image for an asset, loading it on first use."""
+        if asset not in self.originals:
+            self.disk_loads += 1
+            try:
+                self.originals[asset] = load_image(asset, folder=self.folder)
+            except (pygame.error, FileNotFoundError):
+                # Remember the failure so the fallback is used from now on
+                self.originals[asset] = None
+        return self.originals[asset]
+
+    def get(self, asset, size, tint=None):
+        """
+        Return the shared surface for an asset at the given size and tint.
+
+        Args:
+            asset: File name inside the assets folder
+            size: (width, height) of the surface
+            tint: Optional RGBA colour multiplied into the image
+        """
+        key = (asset, size, tint)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        original = self.original(asset)
+        if original is not None:
+            surface = pygame.transform.scale(original, size)
+        else:
+            surface = FALLBACK_IMAGES[asset](size)
+        if tint is not None:
+            surface.fill(tint, special_flags=pygame.BLEND_RGBA_MULT)
+        self.surfaces[key] = surface
+        return surface
+
+    def stats(self):
+        """Counters for checking that nothing reaches the disk mid-run."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_loads": self.disk_loads,
+            "surfaces": len(self.surfaces),
+        }
+
+surface_cache = SurfaceCache()
+
+# --------------------------------------------------------------------------
+#                           COIN ANIMATION ATLAS
+# --------------------------------------------------------------------------
+
+COIN_ROTATION_STEP = 5
+COIN_PULSE_STEP = 0.02
+COIN_PULSE_MIN = 0.8
+COIN_PULSE_MAX = 1.2
+
+coin_frames = []
+
+def build_coin_atlas():
+    """
+    Pre-render one full cycle of the coin spin-and-pulse animation.
+    The angle repeats every 72 steps and the pulse every 40, so 360 frames
+    cover the whole cycle; coins just advance an index into this list.
+    """
+    base = surface_cache.get("coin.png", (COIN_SIZE, COIN_SIZE))
+    original = surface_cache.original("coin.png") or base
+
+    frames = [base]
+    angle = 0
+    scale = 1.0
+    direction = COIN_PULSE_STEP
+    while True:
+        # Same stepping as the old per-coin animation
+        scale += direction
+        if scale > COIN_PULSE_MAX or scale < COIN_PULSE_MIN:
+            direction *= -1
+        angle = (angle + COIN_ROTATION_STEP) % 360
+        size = int(COIN_SIZE * scale)
+        if angle == 0 and size == COIN_SIZE and direction > 0:
+            break
+        rotated = pygame.transform.rotate(original, angle)
+        frames.append(pygame.transform.scale(rotated, (size, size)))
+
+    coin_frames[:] = frames
+    return coin_frames
+
+# --------------------------------------------------------------------------
+#                           DECODED IMAGE CACHE
+# --------------------------------------------------------------------------
+
+ASSET_CACHE_VERSION = 1
+ASSET_CACHE_PATH = os.path.join(".cache", "assets.bin")
+ASSET_CACHE_MAGIC = b"SGAC"
+
+# Decoded, converted and scaled images by (file name, scale factor)
+loaded_images = {}
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+class AssetCache:
+    """
+    Versioned on-disk store of converted and scaled image pixels, so later
+    launches skip PNG decoding and scaling. The file holds a magic number,
+    the format version and the length of a JSON index, then the index, then
+    the raw pixel bytes (pygame.image.tobytes) of every image back to back.
+
+    An entry is used while its source file keeps the same mtime and size,
+    or failing that the same SHA-1; anything else is decoded again.
+    """
+    def __init__(self, path=ASSET_CACHE_PATH, folder="assets"):
+        self.path = path
+        self.folder = folder
+        self.entries = {}
+        self.blob = b""
+        self.pending = {}
+        self.changed = False
+
+    @staticmethod
+    def key(name, scale):
+        return f"{name}@{scale}"
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        header = struct.calcsize("<4sII")
+        if len(data) < header:
+            return
+        magic, version, index_len = struct.unpack_from("<4sII", data)
+        if magic != ASSET_CACHE_MAGIC or version != ASSET_CACHE_VERSION:
+            return
+        try:
+            self.entries = json.loads(data[header:header + index_len])
+        except ValueError:
+            return
+        self.blob = memoryview(data)[header + index_len:]
+
+    def get(self, name, scale):
+        """Return (size, mode, pixel bytes) for a still-valid entry, or None."""
+        key = self.key(name, scale)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        path = os.path.join(self.folder, name)
+        try:
+            stamp = source_stamp(path)
+        except OSError:
+            return None
+        if {k: entry[k] for k in stamp} != stamp:
+            # Touched but maybe not changed: compare contents before decoding
+            if entry["sha1"] != file_hash(path):
+                return None
+            entry.update(stamp)
+            self.changed = True
+        start = entry["offset"]
+        return (entry["w"], entry["h"]), entry["mode"], self.blob[start:start + entry["length"]]
+
+    def put(self, name, scale, surface, mode):
+        path = os.path.join(self.folder, name)
+        entry = source_stamp(path)
+        entry["sha1"] = file_hash(path)
+        entry["w"], entry["h"] = surface.get_size()
+        entry["mode"] = mode
+        self.pending[self.key(name, scale)] = (entry, pygame.image.tobytes(surface, mode))
+        self.changed = True
+
+    def save(self):
+        """Rewrite the cache file if anything was added or refreshed."""
+        if not self.changed:
+            return
+        entries = {}
+        chunks = []
+        offset = 0
+        for key, entry in self.entries.items():
+            if key in self.pending:
+                continue
+            data = self.blob[entry["offset"]:entry["offset"] + entry["length"]]
+            entries[key] = dict(entry, offset=offset)
+            chunks.append(data)
+            offset += entry["length"]
+        for key, (entry, data) in self.pending.items():
+            entries[key] = dict(entry, offset=offset, length=len(data))
+            chunks.append(data)
+            offset += len(data)
+
+        index = json.dumps(entries).encode()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(struct.pack("<4sII", ASSET_CACHE_MAGIC, ASSET_CACHE_VERSION, len(index)))
+                f.write(index)
+                for data in chunks:
+                    f.write(data)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # A read-only checkout just decodes every launch
+        self.changed = False
+
+def decode_image(path, scale, alpha):
+    """Load, convert and scale one image, as the loaders always have."""
+    img = pygame.image.load(path)
+    img = img.convert_alpha() if alpha else img.convert()
+    if scale != 1:
+        w = img.get_width() * scale
+        h = img.get_height() * scale
+        img = pygame.transform.scale(img, (w, h))
+    return img
+
+def preload_images(specs, folder="assets", cache_path=ASSET_CACHE_PATH, workers=None):
+    """
+    Fill loaded_images for a list of (file name, scale, alpha) specs. Images
+    still valid in the on-disk cache are rebuilt from their raw bytes; the
+    rest are decoded on a thread pool and written back to the cache.
+
+    Returns counts of {"cached": ..., "decoded": ...} images.
+    """
+    cache = AssetCache(cache_path, folder)
+    cache.load()
+
+    missing = []
+    for name, scale, alpha in specs:
+        hit = cache.get(name, scale)
+        if hit is None:
+            missing.append((name, scale, alpha))
+            continue
+        size, mode, data = hit
+        img = pygame.image.frombytes(bytes(data), size, mode)
+        loaded_images[(name, scale)] = img.convert_alpha() if alpha else img.convert()
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            decoded = pool.map(lambda spec: decode_image(os.path.join(folder, spec[0]),
+                                                         spec[1], spec[2]), missing)
+            for (name, scale, alpha), img in zip(missing, decoded):
+                loaded_images[(name, scale)] = img
+                cache.put(name, scale, img, "RGBA" if alpha else "RGB")
+    cache.save()
+    return {"cached": len(specs) - len(missing), "decoded": len(missing)}
+
+def load_image(name, scale=1, alpha=True, folder="assets"):
+    """A preloaded image, or decode it now if it was not preloaded."""
+    img = loaded_images.get((name, scale))
+    if img is None:
+        img = loaded_images[(name, scale)] = decode_image(os.path.join(folder, name), scale, alpha)
+    return img
+
+def load_font(name, sizes, folder="assets"):
+    """Read a font file once and open it at each size. Returns {size: Font}."""
+    with open(os.path.join(folder, name), "rb") as f:
+        data = f.read()
+    return {size: pygame.font.Font(io.BytesIO(data), size) for size in sizes}
 
 # --------------------------------------------------------------------------
 #                       ASSET LOADING FUNCTIONS
@@ -29,47 +371,92 @@ ENEMY_KNOCKBACK_SPEED = 5
 def load_frames(prefix, frame_count, scale_factor=1, folder="assets"):
     frames = []
     for i in range(frame_count):
-        image_path = os.path.join(folder, f"{prefix}_{i}.png")
-        img = pygame.image.load(image_path).convert_alpha()
+        frames.append(load_image(f"{prefix}_{i}.png", scale_factor, folder=folder))
+    return frames
 
-        if scale_factor != 1:
-            w = img.get_width() * scale_factor
-            h = img.get_height() * scale_factor
-            img = pygame.transform.scale(img, (w, h))
+class FrameTable:
+    """
+    Animation frames pre-flipped and pre-scaled once, looked up by
+    (frame, facing_left, scale) so sprites never transform per tick.
+    Indexing and len() behave like the plain frame list.
+    """
+    def __init__(self, frames, scales=(1,)):
+        self.frames = frames
+        self.table = {}
+        for scale in scales:
+            self.add_scale(scale)
 
-        frames.append(img)
-    return frames
+    def add_scale(self, scale):
+        for i, frame in enumerate(self.frames):
+            if scale != 1:
+                w = int(frame.get_width() * scale)
+                h = int(frame.get_height() * scale)
+                frame = pygame.transform.scale(frame, (w, h))
+            self.table[(i, False, scale)] = frame
+            self.table[(i, True, scale)] = pygame.transform.flip(frame, True, False)
+
+    def get(self, frame, facing_left=False, scale=1):
+        surface = self.table.get((frame, facing_left, scale))
+        if surface is None:
+            # Unusual scales (e.g. scaled bosses) are built on first use
+            self.add_scale(scale)
+            surface = self.table[(frame, facing_left, scale)]
+        return surface
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def __len__(self):
+        return len(self.frames)
 
 def load_floor_tiles(folder="assets"):
     floor_tiles = []
     for i in range(8):
-        path = os.path.join(folder, f"floor_{i}.png")
-        tile = pygame.image.load(path).convert()
+        floor_tiles.append(load_image(f"floor_{i}.png", FLOOR_TILE_SCALE_FACTOR,
+                                      alpha=False, folder=folder))
+    return floor_tiles
 
-        if FLOOR_TILE_SCALE_FACTOR != 1:
-            tw = tile.get_width() * FLOOR_TILE_SCALE_FACTOR
-            th = tile.get_height() * FLOOR_TILE_SCALE_FACTOR
-            tile = pygame.transform.scale(tile, (tw, th))
+def warm_surface_cache():
+    bullet_size = (BULLET_SIZE, BULLET_SIZE)
+    for tint in (None, HOMING_BULLET_TINT, EXPLOSIVE_BULLET_TINT):
+        surface_cache.get("bullet.png", bullet_size, tint)
+    surface_cache.get("coin.png", (COIN_SIZE, COIN_SIZE))
 
-        floor_tiles.append(tile)
-    return floor_tiles
+def asset_images():
+    """(file name, scale, alpha) of every image load_assets uses."""
+    specs = [("bullet.png", 1, True), ("coin.png", 1, True)]
+    for prefix, count, scale in (("enemy_regular", 4, 1), ("flying_Enemy", 4, 1),
+                                 ("armored_Enemy", 4, 1), ("boss_Enemy", 4, 1),
+                                 ("player_idle", 4, PLAYER_SCALE_FACTOR),
+                                 ("player_run", 4, PLAYER_SCALE_FACTOR),
+                                 ("health", 6, HEALTH_SCALE_FACTOR)):
+        specs += [(f"{prefix}_{i}.png", scale, True) for i in range(count)]
+    specs += [(f"floor_{i}.png", FLOOR_TILE_SCALE_FACTOR, False) for i in range(8)]
+    return specs
 
 def load_assets():
+    # Decode everything up front, in parallel or from the on-disk cache
+    existing = [spec for spec in asset_images()
+                if os.path.exists(os.path.join("assets", spec[0]))]
+    preload_images(existing)
+    warm_surface_cache()
+    build_coin_atlas()
     assets = {
         "enemies": {
-            "regular": load_frames("enemy_regular", 4),  # enemy_regular_0.png, etc.
-            "flying": load_frames("flying_Enemy", 4),    # flying_Enemy_0.png
-            "armored": load_frames("armored_Enemy", 4),  # armored_Enemy_0.png
-            "boss": load_frames("boss_Enemy", 4)         # boss_Enemy_0.png
+            "regular": FrameTable(load_frames("enemy_regular", 4)),  # enemy_regular_0.png, etc.
+            "flying": FrameTable(load_frames("flying_Enemy", 4)),    # flying_Enemy_0.png
+            "armored": FrameTable(load_frames("armored_Enemy", 4)),  # armored_Enemy_0.png
+            "boss": FrameTable(load_frames("boss_Enemy", 4),         # boss_Enemy_0.png
+                               scales=(ENEMY_SCALE_FACTOR,))
         },
         # Player
         "player": {
-            "idle": load_frames("player_idle", 4, scale_factor=PLAYER_SCALE_FACTOR),
-            "run": load_frames("player_run", 4, scale_factor=PLAYER_SCALE_FACTOR),
+            "idle": FrameTable(load_frames("player_idle", 4, scale_factor=PLAYER_SCALE_FACTOR)),
+            "run": FrameTable(load_frames("player_run", 4, scale_factor=PLAYER_SCALE_FACTOR)),
         },
         # Floor tiles
         "floor_tiles": load_floor_tiles(),
         # Health images
         "health": load_frames("health", 6, scale_factor=HEALTH_SCALE_FACTOR)
     }
-    return assets
\ No newline at end of file
+    return assets
@@ -0,0 +1,200 @@
+# batch.py
+"""
+Batch simulator for balance sweeps.
+
+Runs many headless games across a process pool, each with its own seed
+and the autopilot bot, and reports survival time, kills, level reached
+and frame cost per configuration. A sweep is the cross product of every
+--sweep option; each value list is JSON. Keys name a Game attribute, an
+entry of a dict attribute ("enemy_spawn_weights.boss"), an enemy
+archetype stat ("archetypes.summoned_boss.health", see assets/enemies.json)
+or an autopilot option ("policy.fire_every", "policy.prefer"):
+
+    python batch.py --runs 100
+    python batch.py --runs 50 --sweep enemy_spawn_interval=[30,60,90] \\
+        --sweep 'policy.prefer=[["Rapid Fire"],["Health Boost"]]'
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import app
+from game import Game
+from controls import autopilot
+
+POLICY_PREFIX = "policy."
+
+# --------------------------------------------------------------------------
+#                                 WORKER
+# --------------------------------------------------------------------------
+
+def init_worker():
+    """Process pool initialiser: no window and no sound in the workers."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def apply_config(game, config):
+    """Set the tuned Game attributes of a configuration."""
+    for key, value in config.items():
+        if key.startswith(POLICY_PREFIX):
+            continue
+        name, _, entry = key.partition(".")
+        if not hasattr(game, name):
+            raise ValueError(f"unknown setting {key!r}")
+        if name == "archetypes":
+            archetype, _, stat = entry.partition(".")
+            game.archetypes.set(archetype, stat, value)
+        elif entry:
+            getattr(game, name)[entry] = value
+        else:
+            setattr(game, name, value)
+
+
+def run_game(job):
+    """
+    Play one headless game to its game over or the tick limit.
+
+    Args:
+        job: (config index, config, seed, tick limit)
+    """
+    index, config, seed, ticks = job
+    policy = {key[len(POLICY_PREFIX):]: value for key, value in config.items()
+              if key.startswith(POLICY_PREFIX)}
+    game = Game(headless=True, seed=seed, script=autopilot(**policy))
+    apply_config(game, config)
+
+    start = time.perf_counter()
+    survived = game.simulate(ticks)
+    elapsed = time.perf_counter() - start
+    frame = game.profiler.summary()["frame"]
+    return {
+        "config": index,
+        "seed": seed,
+        "ticks": survived,
+        "survival_s": survived / app.SIM_RATE,
+        "died": game.game_over,
+        "kills": game.enemies_killed,
+        "level": game.player.level,
+        "enemies_left": len(game.enemies),
+        "frame_ms": elapsed / max(survived, 1) * 1000,
+        # Over the profiler's window, i.e. the end of the game, where it is busiest
+        "late_p95_ms": frame["p95"],
+    }
+
+# --------------------------------------------------------------------------
+#                                 REPORT
+# --------------------------------------------------------------------------
+
+def spread(values):
+    """Mean and p10/p50/p90 of a list of numbers."""
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        "mean": statistics.fmean(ordered),
+        "p10": ordered[round(last * 0.1)],
+        "p50": ordered[round(last * 0.5)],
+        "p90": ordered[round(last * 0.9)],
+    }
+
+
+def summarise(config, runs):
+    """Aggregate the runs of one configuration."""
+    return {
+        "config": config,
+        "runs": len(runs),
+        "deaths": sum(run["died"] for run in runs),
+        "survival_s": spread([run["survival_s"] for run in runs]),
+        "kills": spread([run["kills"] for run in runs]),
+        "level": spread([run["level"] for run in runs]),
+        "max_level": max(run["level"] for run in runs),
+        "frame_ms": statistics.fmean(run["frame_ms"] for run in runs),
+        "late_p95_ms": max(run["late_p95_ms"] for run in runs),
+    }
+
+
+def parse_sweep(options):
+    """Cross product of every KEY=JSON_LIST option, as a list of dicts."""
+    axes = []
+    for option in options:
+        key, sep, values = option.partition("=")
+        if not sep:
+            raise SystemExit(f"--sweep expects KEY=JSON_LIST, got {option!r}")
+        values = json.loads(values)
+        if not isinstance(values, list):
+            values = [values]
+        axes.append([(key, value) for value in values])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless games in parallel and report balance stats")
+    parser.add_argument("--runs", type=int, default=100, help="games per configuration")
+    parser.add_argument("--ticks", type=int, default=app.SIM_RATE * 600,
+                        help="tick limit per game")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--sweep", action="append", default=[], metavar="KEY=JSON_LIST",
+                        help="setting to vary (repeatable; the sweep is their cross product)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--output", default="batch_results.json", help="JSON report file")
+    args = parser.parse_args()
+
+    configs = parse_sweep(args.sweep)
+    # Every configuration plays the same seeds, so they are compared like for like
+    jobs = [(index, config, args.seed + run, args.ticks)
+            for index, config in enumerate(configs) for run in range(args.runs)]
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as executor:
+        futures = [executor.submit(run_game, job) for job in jobs]
+        step = max(1, len(jobs) // 10)
+        for done, future in enumerate(as_completed(futures), 1):
+            results.append(future.result())
+            if done % step == 0 or done == len(jobs):
+                print(f"{done}/{len(jobs)} games ({time.perf_counter() - start:.0f}s)")
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda run: (run["config"], run["seed"]))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workers": args.workers,
+            "runs": args.runs,
+            "ticks": args.ticks,
+            "seed": args.seed,
+            "games": len(jobs),
+            "wall_s": elapsed,
+            "games_per_s": len(jobs) / elapsed,
+            "simulated_s": sum(run["survival_s"] for run in results),
+        },
+        "configs": [summarise(config, [run for run in results if run["config"] == index])
+                    for index, config in enumerate(configs)],
+        "runs": results,
+    }
+
+    for summary in report["configs"]:
+        survival = summary["survival_s"]
+        print(f"{json.dumps(summary['config']) or '{}'}\n"
+              f"    survival {survival['mean']:7.1f}s (p10 {survival['p10']:.0f}, "
+              f"p90 {survival['p90']:.0f})  deaths {summary['deaths']}/{summary['runs']}  "
+              f"kills {summary['kills']['mean']:6.1f}  level {summary['level']['mean']:4.1f} "
+              f"(max {summary['max_level']})  frame {summary['frame_ms']:.2f} ms")
+    meta = report["meta"]
+    print(f"{meta['games']} games on {meta['workers']} workers in {elapsed:.1f}s "
+          f"({meta['games_per_s']:.1f} games/s, {meta['simulated_s'] / elapsed:.0f}x real time)")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# bench.py
+"""
+Scenario benchmarks for the Game.update and Game.draw hot paths.
+
+Each scenario builds a headless game in a scripted state (a large horde,
+a wide bullet fan, a coin flood...) and times its phases tick by tick.
+Results are printed and written to a JSON file so runs can be compared
+before and after an optimisation:
+
+    python bench.py
+    python bench.py --scenario enemies_10k --ticks 100 --output after.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import time
+
+import numpy as np
+import pygame
+
+import app
+from game import Game
+from coin import Coin
+from controls import key_event
+import snapshot
+
+# --------------------------------------------------------------------------
+#                               SCENARIOS
+# --------------------------------------------------------------------------
+
+def spawn_horde(game, count, min_radius=150, max_radius=700):
+    """Scatter `count` enemies in a ring around the player."""
+    for _ in range(count):
+        angle = random.uniform(0, 2 * math.pi)
+        radius = random.uniform(min_radius, max_radius)
+        x = game.player.x + math.cos(angle) * radius
+        y = game.player.y + math.sin(angle) * radius
+        kind = random.choice(["regular", "flying", "armored"])
+        game.archetypes.get(kind).spawn(game, x, y)
+
+
+def horde(count):
+    def setup(game):
+        spawn_horde(game, count)
+    return setup
+
+
+def bullet_fan(bullet_type, bullet_count=64, enemies=1000):
+    def setup(game):
+        spawn_horde(game, enemies)
+        game.player.bullet_type = bullet_type
+        game.player.bullet_count = bullet_count
+        game.player.shoot_cooldown = 1
+    return setup
+
+
+def coin_flood(count, merge=False):
+    """
+    Coins scattered over the arena, as after a string of boss kills. The
+    flood adds every coin as is, so `count` coins are live whatever
+    max_coins is; with `merge` they go through Game.drop_coins instead.
+    """
+    def setup(game):
+        for _ in range(count):
+            x = random.uniform(0, app.WIDTH)
+            y = random.uniform(0, app.HEIGHT)
+            if merge:
+                game.drop_coins(x, y, 1)
+            else:
+                game.coins.add(Coin.spawn(x, y))
+    return setup
+
+
+def fire_every_tick(tick, game):
+    return (), [key_event(pygame.K_SPACE)]
+
+
+def idle(tick, game):
+    return (), []
+
+
+SCENARIOS = {
+    "enemies_100": (horde(100), idle),
+    "enemies_1k": (horde(1000), idle),
+    "enemies_10k": (horde(10000), idle),
+    "bullet_fan_normal": (bullet_fan("normal"), fire_every_tick),
+    "bullet_fan_homing": (bullet_fan("homing"), fire_every_tick),
+    "bullet_fan_explosive": (bullet_fan("explosive"), fire_every_tick),
+    "coin_flood_1k": (coin_flood(1000), idle),
+    "coin_flood_5k": (coin_flood(5000), idle),
+    "coin_drops_5k": (coin_flood(5000, merge=True), idle),
+}
+
+# --------------------------------------------------------------------------
+#                               RUNNER
+# --------------------------------------------------------------------------
+
+def entity_count(game):
+    return len(game.enemies) + len(game.coins) + len(game.player.bullets)
+
+
+def summarise(samples):
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": ms[len(ms) // 2],
+        "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+        "max_ms": ms[-1],
+    }
+
+
+def run_scenario(name, ticks, seed, state=None):
+    setup, script = SCENARIOS[name]
+    game = Game(headless=True, seed=seed, script=script)
+    if state is not None:
+        # Start mid-game: the scenario is layered on top of the snapshot
+        snapshot.restore(game, state)
+    setup(game)
+
+    # Keep the scenario steady: no natural spawns, no game over, no menus
+    game.enemy_spawn_interval = float("inf")
+    game.player.max_health = game.player.health = 10**9
+
+    phases = {"update": [], "draw": []}
+    entities = []
+    clock = time.perf_counter
+    for _ in range(ticks):
+        game.profiler.begin_frame()
+        game.input.advance()
+        game.handle_events()
+
+        start = clock()
+        game.update()
+        phases["update"].append(clock() - start)
+
+        game.in_level_up_menu = False
+        start = clock()
+        game.draw()
+        phases["draw"].append(clock() - start)
+        game.profiler.end_frame()
+
+        entities.append(entity_count(game))
+
+    total = sum(sum(samples) for samples in phases.values())
+    result = {name: summarise(samples) for name, samples in phases.items()}
+    result["ticks"] = ticks
+    result["mean_entities"] = statistics.fmean(entities)
+    result["ms_per_tick"] = total / ticks * 1000
+    result["entities_per_sec"] = sum(entities) / total if total else 0.0
+    # Finer breakdown of update/draw from the game's frame profiler
+    result["profile"] = game.profiler.summary()["phases"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Game.update and Game.draw scenarios")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--ticks", type=int, default=120, help="ticks per scenario")
+    parser.add_argument("--seed", type=int, default=1234, help="random seed")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="start every scenario from a saved game snapshot")
+    args = parser.parse_args()
+    state = None
+    if args.snapshot:
+        with open(args.snapshot, "rb") as f:
+            state = f.read()
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "ticks": args.ticks,
+            "seed": args.seed,
+            "snapshot": args.snapshot,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(name, args.ticks, args.seed, state)
+        results["scenarios"][name] = result
+        print(f"{name:22} {result['ms_per_tick']:8.2f} ms/tick  "
+              f"update {result['update']['mean_ms']:7.2f}  "
+              f"draw {result['draw']['mean_ms']:7.2f}  "
+              f"{result['entities_per_sec']:12.0f} entities/s")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
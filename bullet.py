@@ -1,114 +1,33 @@
 import pygame
+import numpy as np
 import app
-import os
-import math
+from ecs import (Table, EntityIds, TRANSFORM, VELOCITY, SPRITE, HOMING,
+                 store_previous, integrate, steer_homing, cull, interpolate)
 
 class Bullet:
     """
-    The Bullet class represents projectiles fired by the player.
-    It handles movement, rendering, and collision detection.
+    The Bullet class describes projectiles fired by the player.
+    Live bullets are rows in a BulletStore rather than objects; this class
+    and its subclasses hold the per-type data used for each kind of row.
     """
-    def __init__(self, x, y, vx, vy, size):
-        """
-        Initialize a new bullet object.
-        
-        Args:
-            x, y: Initial position coordinates
-            vx, vy: Velocity components
-            size: Size of the bullet
-        """
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.size = size
-        
-        # Calculate bullet rotation based on velocity
-        self.angle = math.degrees(math.atan2(vy, vx))
-        
-        # Load the bullet image
-        try:
-            bullet_path = os.path.join("assets", "bullet.png")
-            self.original_image = pygame.image.load(bullet_path).convert_alpha()
-            self.image = pygame.transform.scale(self.original_image, (self.size, self.size))
-        except pygame.error:
-            # Fallback if image loading fails
-            self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-            pygame.draw.circle(self.image, (255, 255, 100), 
-                              (self.size//2, self.size//2), self.size//2)
-            pygame.draw.circle(self.image, (255, 255, 255), 
-                              (self.size//2, self.size//2), self.size//4)
-        
-        self.rect = self.image.get_rect(center=(self.x, self.y))
-    
-    def update(self):
-        """Update bullet position and handle rotation"""
-        self.x += self.vx
-        self.y += self.vy
-        self.rect.center = (self.x, self.y)
-    
-    def draw(self, surface, offset_x=0, offset_y=0):
-        """
-        Draw the bullet on the given surface.
-        
-        Args:
-            surface: The surface to draw on
-            offset_x, offset_y: Screen shake offsets
-        """
-        # Apply screen shake offset
-        adjusted_rect = self.rect.copy()
-        adjusted_rect.x += offset_x
-        adjusted_rect.y += offset_y
-        surface.blit(self.image, adjusted_rect)
-        
+    kind = 0
+    tint = None
+    explosion_radius = 0  # Only explosive bullets deal area damage
+
+    @classmethod
+    def image(cls, size):
+        """Shared, read-only image for this bullet type (no disk access)."""
+        return app.surface_cache.get("bullet.png", (size, size), cls.tint)
+
 
 class HomingBullet(Bullet):
     """
     A bullet that follows enemies. Inherits from the Bullet class.
     """
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.homing_strength = 0.1
-        self.target = None
-        
-        # Give homing bullets a different color tint
-        try:
-            # Tint the bullet blue
-            self.image.fill((100, 100, 255, 150), special_flags=pygame.BLEND_RGBA_MULT)
-        except:
-            pass
-    
-    def find_target(self, enemies):
-        """Find the closest enemy to target"""
-        if not enemies:
-            return None
-        closest = None
-        min_dist = float('inf')
-        for enemy in enemies:
-            dist = (self.x - enemy.x)**2 + (self.y - enemy.y)**2
-            if dist < min_dist:
-                min_dist = dist
-                closest = enemy
-        return closest
-    
-    def update(self, enemies=None):
-        """Update the homing bullet's trajectory to follow enemies"""
-        if enemies:
-            if not self.target or self.target not in enemies:
-                self.target = self.find_target(enemies)
-            
-            if self.target:
-                dx = self.target.x - self.x
-                dy = self.target.y - self.y
-                dist = (dx**2 + dy**2) ** 0.5
-                if dist != 0:
-                    self.vx += dx/dist * self.homing_strength
-                    self.vy += dy/dist * self.homing_strength
-                    
-                    # Calculate new angle for rotation
-                    self.angle = math.degrees(math.atan2(self.vy, self.vx))
-        
-        super().update()
+    kind = 1
+    # Homing bullets are tinted blue
+    tint = app.HOMING_BULLET_TINT
+    homing_strength = 0.1 * app.TICK_SCALE**2  # Velocity change per tick
 
 
 class ExplosiveBullet(Bullet):
@@ -116,30 +35,176 @@ class ExplosiveBullet(Bullet):
     A bullet that explodes on impact, dealing area damage.
     Inherits from the Bullet class.
     """
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.explosion_radius = 50
-        self.exploded = False
-        
-        # Give explosive bullets a red tint
-        try:
-            # Tint the bullet red
-            self.image.fill((255, 100, 100, 150), special_flags=pygame.BLEND_RGBA_MULT)
-        except:
-            pass
-    
-    def explode(self, game):
-        """Handle the explosion effect and damage"""
-        if not self.exploded:
-            # Damage all enemies in radius
-            for enemy in game.enemies[:]:
-                dx = enemy.x - self.x
-                dy = enemy.y - self.y
-                if (dx**2 + dy**2) ** 0.5 <= self.explosion_radius:
-                    enemy.take_damage(2)
-                    
-                    # Add visual effect - knockback all enemies in radius
-                    enemy.set_knockback(self.x, self.y, 20)
-            
-            # Add explosion visual effect
-            self.exploded = True
\ No newline at end of file
+    kind = 2
+    # Explosive bullets are tinted red
+    tint = app.EXPLOSIVE_BULLET_TINT
+    explosion_radius = 50
+
+    @classmethod
+    def explode(cls, game, x, y):
+        """Handle the explosion effect and damage at (x, y)"""
+        # Damage all enemies in radius (only nearby grid cells are checked)
+        for enemy in game.enemy_grid.query_radius(x, y, cls.explosion_radius):
+            if enemy.dying:
+                continue
+            if enemy.take_damage(2):
+                game.on_enemy_killed(enemy)
+
+            # Add visual effect - knockback all enemies in radius
+            enemy.set_knockback(x, y, 20)
+
+
+BULLET_TYPES = {
+    "normal": Bullet,
+    "homing": HomingBullet,
+    "explosive": ExplosiveBullet,
+}
+
+
+class BulletStore(Table):
+    """
+    Table of every live projectile (see ecs.Table): transform, velocity,
+    sprite (size and bullet type) and homing target columns, one row per
+    bullet. Moving, steering and culling all bullets takes a few
+    vectorized system calls per tick instead of a loop over objects.
+    Rows stay in firing order.
+    """
+    types = (Bullet, HomingBullet, ExplosiveBullet)
+    NO_TARGET = EntityIds.NONE
+
+    def __init__(self, ids=None, capacity=256):
+        super().__init__((TRANSFORM, VELOCITY, SPRITE, HOMING), ids, capacity, keep_order=True)
+        self.high_water = 0
+
+    def add(self, x, y, vx, vy, size, bullet_type=Bullet):
+        """
+        Append a bullet row.
+
+        Args:
+            x, y: Initial position coordinates
+            vx, vy: Velocity components
+            size: Size of the bullet
+            bullet_type: Bullet, HomingBullet or ExplosiveBullet
+        """
+        super().add(x=x, y=y, prev_x=x, prev_y=y, vx=vx, vy=vy, size=size, kind=bullet_type.kind)
+        if self.count > self.high_water:
+            self.high_water = self.count
+
+    def add_many(self, n, columns):
+        rows = super().add_many(n, columns)
+        self.high_water = max(self.high_water, self.count)
+        return rows
+
+    def type_of(self, i):
+        return self.types[self.kind[i]]
+
+    def stats(self):
+        """Rows are recycled in place, so the arrays act as the bullet pool."""
+        return {
+            "live": self.count,
+            "capacity": len(self.x),
+            "high_water": self.high_water,
+        }
+
+    def steer_homing(self, horde):
+        """Lock homing rows on to the nearest enemy and turn them toward it."""
+        if horde is None:
+            return
+        homing = np.flatnonzero(self.kind[:self.count] == HomingBullet.kind)
+        steer_homing(self, homing, horde, HomingBullet.homing_strength, horde.nearest_rows)
+
+    def update(self, horde=None, bounds=None):
+        """
+        Steer, move and cull every bullet.
+
+        Args:
+            horde: Horde that homing bullets steer toward
+            bounds: World (left, top, right, bottom) outside which bullets
+                are dropped; defaults to the screen at the origin
+        """
+        self.steer_homing(horde)
+        store_previous(self)
+        integrate(self)
+        # Cull bullets that left the view
+        cull(self, bounds or (0, 0, app.WIDTH, app.HEIGHT))
+        self.compact()
+
+    def topleft(self, alpha=1.0):
+        """
+        Integer top-left corners of every row, as pygame rounds a centred
+        rect. With alpha < 1 the centre is interpolated from the position
+        at the start of the tick.
+        """
+        n = self.count
+        x, y = interpolate(self, slice(0, n), alpha)
+        half = self.size[:n] // 2
+        left = np.floor(x + 0.5).astype(np.int64) - half
+        top = np.floor(y + 0.5).astype(np.int64) - half
+        return left, top
+
+    def rect(self, i):
+        size = int(self.size[i])
+        rect = pygame.Rect(0, 0, size, size)
+        rect.center = (float(self.x[i]), float(self.y[i]))
+        return rect
+
+    def candidates(self, grid):
+        """
+        Rows whose bounds touch an occupied cell of a SpatialGrid. Bullets
+        flying through empty space are filtered out without a Python loop.
+        """
+        n = self.count
+        if n == 0 or not grid.cells:
+            return []
+        cs = grid.cell_size
+        if self.size[:n].max() > cs:
+            return list(range(n))
+
+        left, top = self.topleft()
+        right = left + self.size[:n] - 1
+        bottom = top + self.size[:n] - 1
+
+        offset = 1 << 20
+        occupied = np.fromiter(((cx + offset) << 21 | (cy + offset) for cx, cy in grid.cells),
+                               dtype=np.int64, count=len(grid.cells))
+        hit = np.zeros(n, dtype=bool)
+        for cx in (left // cs, right // cs):
+            for cy in (top // cs, bottom // cs):
+                hit |= np.isin((cx + offset) << 21 | (cy + offset), occupied)
+        return np.flatnonzero(hit & self.alive[:n]).tolist()
+
+    def sprites(self, alpha=1.0, offset_x=0, offset_y=0, view=None):
+        """
+        (image, top-left) pairs for every bullet, ready for Surface.blits.
+        With a view (left, top, right, bottom), bullets outside it are skipped.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        left, top = self.topleft(alpha)
+        kinds = self.kind[:n]
+        sizes = self.size[:n]
+        if view is not None:
+            visible = ((left + sizes > view[0]) & (left < view[2]) &
+                       (top + sizes > view[1]) & (top < view[3]))
+            left, top, kinds, sizes = left[visible], top[visible], kinds[visible], sizes[visible]
+        images = {}
+        batch = []
+        for kind, size, bx, by in zip(kinds.tolist(), sizes.tolist(),
+                                      (left + offset_x).tolist(), (top + offset_y).tolist()):
+            image = images.get((kind, size))
+            if image is None:
+                image = images[(kind, size)] = self.types[kind].image(size)
+            batch.append((image, (bx, by)))
+        return batch
+
+    def draw(self, surface, offset_x=0, offset_y=0, alpha=1.0):
+        """
+        Draw every bullet on the given surface. Returns the rects drawn.
+
+        Args:
+            surface: The surface to draw on
+            offset_x, offset_y: Screen shake offsets
+            alpha: Fraction of the way from the previous tick to this one
+        """
+        return surface.blits(self.sprites(alpha, offset_x, offset_y))
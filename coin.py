@@ -1,20 +1,31 @@
-import pygame
 import app
-import os
 import math
 import random
+import numpy as np
+from pool import Pooled
 
-class Coin:
+class Coin(Pooled):
     """
     The Coin class represents collectible items dropped by defeated enemies.
-    Players can collect coins to gain XP.
+    Players can collect coins to gain XP. One coin can carry the value of
+    several drops (see Game.spawn_dropped_coins).
     """
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "prev_x", "prev_y", "image", "rect", "animation_timer", "frame_index",
+                 "velocity_y", "ground_y", "value", "entity", "store_index")
+
+    # Animation and movement constants shared by every coin
+    animation_speed = app.ticks(5)
+    gravity = 0.1 * app.TICK_SCALE**2
+    bounce_factor = 0.5
+    friction = 0.95 ** app.TICK_SCALE
+
+    def __init__(self, x, y, value=1):
         """
         Initialize a new coin object.
         
         Args:
             x, y: Initial position coordinates
+            value: XP given when the coin is collected
         """
         self.x = x
         self.y = y
@@ -22,44 +33,39 @@ class Coin:
         # Add randomness to initial coin position for spread effect
         self.x += random.randint(-10, 10)
         self.y += random.randint(-10, 10)
+        # Keep the tick's start position for interpolation
+        self.prev_x = self.x
+        self.prev_y = self.y
+        # The world scrolls, so coins land back where they dropped
+        self.ground_y = self.y
         
-        # Load the coin image
-        try:
-            coin_path = os.path.join("assets", "coin.png")
-            self.original_image = pygame.image.load(coin_path).convert_alpha()
-            self.image = pygame.transform.scale(self.original_image, (20, 20))
-        except pygame.error:
-            # Fallback if image loading fails
-            self.image = pygame.Surface((20, 20), pygame.SRCALPHA)
-            pygame.draw.circle(self.image, (255, 215, 0), (10, 10), 10)
-            pygame.draw.circle(self.image, (255, 255, 0), (10, 10), 6)
+        # Shared, read-only image from the surface cache (no disk access)
+        self.image = app.surface_cache.get("coin.png", (app.COIN_SIZE, app.COIN_SIZE))
         
         self.rect = self.image.get_rect(center=(self.x, self.y))
         
-        # Animation variables
+        # Animation variables (index into the pre-rendered app.coin_frames)
         self.animation_timer = 0
-        self.animation_speed = 5
-        self.scale_factor = 1.0
-        self.scale_direction = 0.02
-        self.angle = 0
+        self.frame_index = 0
         
         # Movement variables for a more dynamic feel
-        self.velocity_y = -2  # Initial upward movement
-        self.gravity = 0.1
-        self.bounce_factor = 0.5
-        self.friction = 0.95
+        self.velocity_y = -2 * app.TICK_SCALE  # Initial upward movement
+        self.value = value
 
     def update(self):
         """Update coin position, animation and physics"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
         # Apply gravity and friction
         self.velocity_y += self.gravity
         self.y += self.velocity_y
         self.velocity_y *= self.friction
         
         # Bounce if hit ground
-        if self.y > self.rect.height + app.HEIGHT - 100:
-            self.y = app.HEIGHT - 100
-            if abs(self.velocity_y) > 0.5:
+        if self.y > self.ground_y:
+            self.y = self.ground_y
+            if abs(self.velocity_y) > 0.5 * app.TICK_SCALE:
                 self.velocity_y = -self.velocity_y * self.bounce_factor
             else:
                 self.velocity_y = 0
@@ -68,17 +74,10 @@ class Coin:
         self.animation_timer += 1
         if self.animation_timer >= self.animation_speed:
             self.animation_timer = 0
-            self.scale_factor += self.scale_direction
-            if self.scale_factor > 1.2 or self.scale_factor < 0.8:
-                self.scale_direction *= -1
-            
-            # Rotate coin
-            self.angle = (self.angle + 5) % 360
-            
-            # Update image with new size and rotation
-            rotated = pygame.transform.rotate(self.original_image, self.angle)
-            new_size = int(20 * self.scale_factor)
-            self.image = pygame.transform.scale(rotated, (new_size, new_size))
+
+            # Advance to the next pre-rotated, pre-scaled frame
+            self.frame_index = (self.frame_index + 1) % len(app.coin_frames)
+            self.image = app.coin_frames[self.frame_index]
             
             # Keep center position
             old_center = self.rect.center
@@ -88,16 +87,72 @@ class Coin:
         # Update rect position
         self.rect.center = (self.x, self.y)
 
-    def draw(self, surface, offset_x=0, offset_y=0):
+    def sprite(self, alpha=1.0):
+        """(image, rect) to draw this frame, interpolated from the previous tick."""
+        if alpha == 1.0:
+            return self.image, self.rect
+        rect = self.rect.copy()
+        rect.center = (self.prev_x + (self.x - self.prev_x) * alpha,
+                       self.prev_y + (self.y - self.prev_y) * alpha)
+        return self.image, rect
+
+    def draw(self, surface, offset_x=0, offset_y=0, alpha=1.0):
         """
         Draw the coin on the given surface.
         
         Args:
             surface: The surface to draw on
             offset_x, offset_y: Screen shake offsets
+            alpha: Fraction of the way from the previous tick to this one
         """
-        # Apply screen shake offset
-        adjusted_rect = self.rect.copy()
-        adjusted_rect.x += offset_x
-        adjusted_rect.y += offset_y
-        surface.blit(self.image, adjusted_rect)
\ No newline at end of file
+        image, rect = self.sprite(alpha)
+        return surface.blit(image, (rect.x + offset_x, rect.y + offset_y))
+
+def attract(coins, target_x, target_y, radius=app.COIN_MAGNET_RADIUS, speed=app.COIN_MAGNET_SPEED):
+    """
+    Magnet pickup: pull every coin within `radius` of the target toward it
+    by up to `speed` pixels, with the distances worked out in one array
+    pass. Pulled coins stop bouncing and settle where they are moved to.
+    """
+    n = len(coins)
+    if n == 0:
+        return
+    x = np.fromiter((coin.x for coin in coins), dtype=float, count=n)
+    y = np.fromiter((coin.y for coin in coins), dtype=float, count=n)
+    dx = target_x - x
+    dy = target_y - y
+    dist = np.hypot(dx, dy)
+    pulled = np.flatnonzero((dist <= radius) & (dist > 0))
+    if len(pulled) == 0:
+        return
+    step = np.minimum(speed, dist[pulled]) / dist[pulled]
+    new_x = (x[pulled] + dx[pulled] * step).tolist()
+    new_y = (y[pulled] + dy[pulled] * step).tolist()
+    for i, cx, cy in zip(pulled.tolist(), new_x, new_y):
+        coin = coins[i]
+        coin.x = cx
+        coin.y = coin.ground_y = cy
+        coin.velocity_y = 0
+        coin.rect.center = (cx, cy)
+
+def nearest_coins(coins, x, y):
+    """
+    For each query point, the index of the coin whose landing spot (x,
+    ground_y) is closest and the squared distance to it, for every point
+    in one array pass. Index -1 and an infinite distance if there are no
+    coins.
+
+    Args:
+        coins: Sequence of coins
+        x, y: Sequences of query coordinates
+    """
+    n = len(coins)
+    qx = np.asarray(x, dtype=float)
+    qy = np.asarray(y, dtype=float)
+    if n == 0:
+        return np.full(len(qx), -1), np.full(len(qx), np.inf)
+    cx = np.fromiter((coin.x for coin in coins), dtype=float, count=n)
+    cy = np.fromiter((coin.ground_y for coin in coins), dtype=float, count=n)
+    dist_sq = (qx[:, None] - cx)**2 + (qy[:, None] - cy)**2
+    index = dist_sq.argmin(axis=1)
+    return index, dist_sq[np.arange(len(qx)), index]
@@ -0,0 +1,224 @@
+import struct
+import zlib
+
+import pygame
+
+import app
+
+# Held keys the game reads; recordings store them as a bit mask
+TRACKED_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+
+class KeyboardInput:
+    """
+    Input source for normal play: held keys and events come straight from
+    pygame's keyboard state and event queue.
+    """
+    def advance(self):
+        pass
+
+    def pressed(self):
+        return pygame.key.get_pressed()
+
+    def events(self):
+        return pygame.event.get()
+
+
+class HeldKeys:
+    """Set of held key codes that can be indexed like pygame.key.get_pressed()."""
+    def __init__(self, keys=()):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class ScriptedInput:
+    """
+    Input source driven by a script instead of the keyboard, for headless
+    runs. The script is called once per tick as `script(tick, game)` and
+    returns (held_keys, events): an iterable of key codes held this tick and
+    a list of pygame events to handle.
+    """
+    def __init__(self, game, script):
+        self.game = game
+        self.script = script
+        self.tick = 0
+        self.held = HeldKeys()
+        self.pending = []
+
+    def advance(self):
+        """Run the script for the next tick."""
+        held, events = self.script(self.tick, self.game)
+        self.held = HeldKeys(held)
+        self.pending = list(events)
+        self.tick += 1
+
+    def pressed(self):
+        return self.held
+
+    def events(self):
+        events, self.pending = self.pending, []
+        return events
+
+
+# --------------------------------------------------------------------------
+#                           RECORDING AND REPLAY
+# --------------------------------------------------------------------------
+#
+# A recording is a header (magic, format version, tick rate, seed, tick
+# count) followed by a zlib-compressed stream with one record per tick:
+# the held-key mask, the number of events, then each event the game acts on.
+
+RECORDING_MAGIC = b"SGIR"
+RECORDING_VERSION = 1
+RECORDING_HEADER = "<4sHHQI"
+
+EVENT_QUIT = 0
+EVENT_KEYDOWN = 1
+EVENT_MOUSEDOWN = 2
+
+def encode_event(event):
+    """Packed bytes for an event, or None for events the game ignores."""
+    if event.type == pygame.QUIT:
+        return struct.pack("<B", EVENT_QUIT)
+    if event.type == pygame.KEYDOWN:
+        return struct.pack("<BI", EVENT_KEYDOWN, event.key)
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return struct.pack("<BBhh", EVENT_MOUSEDOWN, event.button, *event.pos)
+    return None
+
+
+class RecordingInput:
+    """
+    Wraps another input source and records what it produced each tick, so
+    the session can be replayed exactly from the same seed. The game only
+    ever sees the recorded form of the input, so a live session and its
+    replay take identical paths.
+    """
+    def __init__(self, source, seed):
+        self.source = source
+        self.seed = seed
+        self.ticks = 0
+        self.stream = bytearray()
+        self.held = HeldKeys()
+        self.pending = []
+
+    def advance(self):
+        self.source.advance()
+        pressed = self.source.pressed()
+        mask = 0
+        held = []
+        for bit, key in enumerate(TRACKED_KEYS):
+            if pressed[key]:
+                mask |= 1 << bit
+                held.append(key)
+
+        events = []
+        packed = []
+        for event in self.source.events():
+            data = encode_event(event)
+            if data is not None:
+                events.append(event)
+                packed.append(data)
+
+        self.stream += struct.pack("<BB", mask, len(packed))
+        for data in packed:
+            self.stream += data
+        self.held = HeldKeys(held)
+        self.pending = events
+        self.ticks += 1
+
+    def pressed(self):
+        return self.held
+
+    def events(self):
+        events, self.pending = self.pending, []
+        return events
+
+    def save(self, path):
+        header = struct.pack(RECORDING_HEADER, RECORDING_MAGIC, RECORDING_VERSION,
+                             app.SIM_RATE, self.seed, self.ticks)
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(zlib.compress(bytes(self.stream), 9))
+
+
+class ReplayInput:
+    """
+    Input source that plays back a recording tick by tick. `finished` is
+    set once every recorded tick has been handed out.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        size = struct.calcsize(RECORDING_HEADER)
+        magic, version, sim_rate, self.seed, self.ticks = struct.unpack_from(RECORDING_HEADER, data)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{path} is not a version {RECORDING_VERSION} recording")
+        if sim_rate != app.SIM_RATE:
+            raise ValueError(f"{path} was recorded at {sim_rate} ticks/s, not {app.SIM_RATE}")
+        self.stream = zlib.decompress(data[size:])
+        self.offset = 0
+        self.tick = 0
+        self.finished = False
+        self.held = HeldKeys()
+        self.pending = []
+
+    def read(self, fmt):
+        values = struct.unpack_from(fmt, self.stream, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def advance(self):
+        if self.tick >= self.ticks:
+            self.finished = True
+            self.held = HeldKeys()
+            self.pending = []
+            return
+
+        mask, count = self.read("<BB")
+        self.held = HeldKeys(key for bit, key in enumerate(TRACKED_KEYS) if mask >> bit & 1)
+        events = []
+        for _ in range(count):
+            kind, = self.read("<B")
+            if kind == EVENT_QUIT:
+                events.append(pygame.event.Event(pygame.QUIT))
+            elif kind == EVENT_KEYDOWN:
+                key, = self.read("<I")
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+            else:
+                button, x, y = self.read("<Bhh")
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=(x, y)))
+        self.pending = events
+        self.tick += 1
+
+    def pressed(self):
+        return self.held
+
+    def events(self):
+        events, self.pending = self.pending, []
+        return events
+
+
+def key_event(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key)
+
+
+def autopilot(fire_every=app.ticks(10), prefer=()):
+    """
+    Simple bot script: stands still, auto-aims at the nearest enemy every
+    `fire_every` ticks and takes the offered upgrade that comes first in
+    `prefer` (a list of upgrade names), or the first one offered.
+    """
+    rank = {name: i for i, name in enumerate(prefer)}
+
+    def script(tick, game):
+        if game.in_level_up_menu:
+            names = [upgrade["name"] for upgrade in game.upgrade_options]
+            choice = min(range(len(names)), key=lambda i: rank.get(names[i], len(rank)),
+                         default=0)
+            return (), [key_event(pygame.K_1 + choice)]
+        if tick % fire_every == 0:
+            return (), [key_event(pygame.K_SPACE)]
+        return (), []
+    return script
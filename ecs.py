@@ -0,0 +1,407 @@
+import numpy as np
+
+# --------------------------------------------------------------------------
+#                               ENTITY IDS
+# --------------------------------------------------------------------------
+
+class EntityIds:
+    """
+    Generational entity ids shared by every table of a world. An id packs
+    a slot and that slot's generation (slot | generation << 32); freeing
+    the slot bumps its generation, so ids still held elsewhere, such as a
+    homing bullet's target, stop resolving instead of pointing at whatever
+    reuses the slot.
+    """
+    NONE = -1
+    SLOT_MASK = 0xFFFFFFFF
+
+    def __init__(self, capacity=256):
+        self.generation = np.zeros(capacity, dtype=np.int64)
+        self.free_slots = []
+        self.slots_used = 0
+
+    def new(self):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.slots_used == len(self.generation):
+                self.generation = np.append(self.generation, np.zeros(len(self.generation),
+                                                                      dtype=np.int64))
+            slot = self.slots_used
+            self.slots_used += 1
+        return int(self.generation[slot]) << 32 | slot
+
+    def new_many(self, n):
+        return np.array([self.new() for _ in range(n)], dtype=np.int64)
+
+    def free(self, entities):
+        """Retire an array of ids; their slots are handed out again later."""
+        slots = np.asarray(entities, dtype=np.int64) & self.SLOT_MASK
+        self.generation[slots] += 1
+        self.free_slots.extend(slots.tolist())
+
+    def current(self, entities):
+        """Per-id flags: True where the id has not been retired."""
+        entities = np.asarray(entities, dtype=np.int64)
+        slots = entities & self.SLOT_MASK
+        valid = (entities >= 0) & (slots < self.slots_used)
+        slots = np.where(valid, slots, 0)
+        return valid & (self.generation[slots] == entities >> 32)
+
+# --------------------------------------------------------------------------
+#                               COMPONENTS
+# --------------------------------------------------------------------------
+
+class Component:
+    """
+    A named group of columns, each a dtype or a (dtype, default) pair.
+    Tables store one dense NumPy array per column.
+    """
+    def __init__(self, name, **columns):
+        self.name = name
+        self.columns = {}
+        for column, spec in columns.items():
+            dtype, default = spec if isinstance(spec, tuple) else (spec, 0)
+            self.columns[column] = (np.dtype(dtype), default)
+
+
+TRANSFORM = Component("transform", x=float, y=float,
+                      # Position at the start of the tick, for render interpolation
+                      prev_x=float, prev_y=float)
+VELOCITY = Component("velocity", vx=float, vy=float)
+CHASE = Component("chase", speed=float, facing_left=bool)
+KNOCKBACK = Component("knockback", knockback_dx=float, knockback_dy=float,
+                      knockback_dist_remaining=float)
+HEALTH = Component("health", health=float)
+SPRITE = Component("sprite", size=np.int32, kind=np.int8)
+HOMING = Component("homing", target=(np.int64, EntityIds.NONE))
+
+
+class Table:
+    """
+    Dense storage for entities that share one set of components: one
+    NumPy array per column, live rows packed at the front. slot_row maps
+    an id's slot to its row, so id -> row is an O(1) array lookup, also
+    for whole arrays of ids at once.
+
+    Removal is deferred: kill() flags a row, which stays readable for the
+    rest of the tick, and compact() drops the flagged rows in one pass.
+    By default the last rows are swapped into the holes (O(1) per removal,
+    order not kept); with keep_order the survivors are packed in order.
+    """
+    def __init__(self, components, ids=None, capacity=256, keep_order=False):
+        self.components = {component.name for component in components}
+        self.ids = ids if ids is not None else EntityIds()
+        self.keep_order = keep_order
+        self.count = 0
+        self.defaults = {"alive": False, "entity": EntityIds.NONE}
+        dtypes = {"alive": np.dtype(bool), "entity": np.dtype(np.int64)}
+        for component in components:
+            for column, (dtype, default) in component.columns.items():
+                dtypes[column] = dtype
+                self.defaults[column] = default
+        self.column_names = tuple(dtypes)
+        for name, dtype in dtypes.items():
+            setattr(self, name, np.full(capacity, self.defaults[name], dtype=dtype))
+        self.slot_row = np.full(capacity, -1, dtype=np.int64)
+
+    def __len__(self):
+        return self.count
+
+    def require(self, *components):
+        missing = [c.name for c in components if c.name not in self.components]
+        if missing:
+            raise TypeError(f"{type(self).__name__} has no {', '.join(missing)} component")
+
+    def _grow(self, capacity):
+        for name in self.column_names:
+            old = getattr(self, name)
+            new = np.full(capacity, self.defaults[name], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def reserve(self, capacity):
+        """Grow the arrays until they hold at least `capacity` rows."""
+        size = len(self.alive)
+        if size < capacity:
+            while size < capacity:
+                size *= 2
+            self._grow(size)
+
+    def _link(self, rows, entities):
+        slots = entities & EntityIds.SLOT_MASK
+        if len(slots) and slots.max() >= len(self.slot_row):
+            self.slot_row = np.append(self.slot_row,
+                                      np.full(len(self.ids.generation), -1, dtype=np.int64))
+        self.slot_row[slots] = rows
+
+    def add(self, **values):
+        """Append a row for a new entity; unset columns take their defaults. Returns (row, id)."""
+        row = self.count
+        if row == len(self.alive):
+            self._grow(row * 2)
+        for name in self.column_names:
+            getattr(self, name)[row] = values.get(name, self.defaults[name])
+        entity = self.ids.new()
+        self.entity[row] = entity
+        self.alive[row] = True
+        slot = entity & EntityIds.SLOT_MASK
+        if slot >= len(self.slot_row):
+            self._link(np.array([row]), np.array([entity]))
+        else:
+            self.slot_row[slot] = row
+        self.count += 1
+        return row, entity
+
+    def add_many(self, n, columns):
+        """Append `n` rows filled from a dict of column -> array. Returns their rows."""
+        start = self.count
+        self.reserve(start + n)
+        rows = np.arange(start, start + n)
+        for name in self.column_names:
+            getattr(self, name)[start:start + n] = columns.get(name, self.defaults[name])
+        entities = self.ids.new_many(n)
+        self.entity[start:start + n] = entities
+        self.alive[start:start + n] = True
+        self._link(rows, entities)
+        self.count += n
+        return rows
+
+    def kill(self, row):
+        """Flag a row as dead; it is dropped on the next compact()."""
+        self.alive[row] = False
+
+    def clear(self):
+        """Drop every row at once, retiring all their ids."""
+        n = self.count
+        entities = self.entity[:n]
+        self.ids.free(entities)
+        self.slot_row[entities & EntityIds.SLOT_MASK] = -1
+        self.alive[:n] = False
+        self.count = 0
+
+    def compact(self):
+        """
+        Drop every dead row and retire its id. Returns (dead, holes, moved):
+        the rows dropped, the rows that now hold a moved entity and the
+        rows those came from.
+        """
+        n = self.count
+        alive = self.alive[:n]
+        dead = np.flatnonzero(~alive)
+        if len(dead) == 0:
+            return dead, dead, dead
+        entities = self.entity[dead]
+        self.ids.free(entities)
+        self.slot_row[entities & EntityIds.SLOT_MASK] = -1
+
+        size = n - len(dead)
+        if self.keep_order:
+            moved = np.flatnonzero(alive)
+            holes = np.arange(size)
+            changed = moved != holes
+            holes, moved = holes[changed], moved[changed]
+        else:
+            # Live rows past the new end fill the holes before it
+            holes = dead[dead < size]
+            tail = np.arange(size, n)
+            moved = tail[alive[size:]]
+        if len(holes):
+            for name in self.column_names:
+                column = getattr(self, name)
+                column[holes] = column[moved]
+            self.slot_row[self.entity[holes] & EntityIds.SLOT_MASK] = holes
+        self.alive[size:n] = False
+        self.count = size
+        return dead, holes, moved
+
+    def rows_of(self, entities):
+        """Current rows for an array of ids, -1 where the entity is dead or gone."""
+        entities = np.asarray(entities, dtype=np.int64)
+        current = self.ids.current(entities)
+        slots = entities & EntityIds.SLOT_MASK
+        current &= slots < len(self.slot_row)
+        rows = np.where(current, self.slot_row[np.where(current, slots, 0)], -1)
+        live = rows >= 0
+        live[live] = self.alive[rows[live]]
+        return np.where(live, rows, -1)
+
+class EntityStore:
+    """
+    Live Python objects of one kind (e.g. coins) in a dense list, each
+    with a generational handle, removed in O(1). despawn() only queues an
+    object; flush(), once at the end of a tick, swap-removes everything
+    queued and hands it to `on_despawn` (e.g. back to its pool), so loops
+    over the store during a tick never see it change and need no copies.
+    Stored objects get `entity` and `store_index` attributes.
+    """
+    def __init__(self, ids=None, on_despawn=None):
+        self.ids = ids if ids is not None else EntityIds()
+        self.on_despawn = on_despawn
+        self.items = []
+        self.by_slot = {}
+        self.queued = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def add(self, obj):
+        obj.entity = self.ids.new()
+        obj.store_index = len(self.items)
+        self.items.append(obj)
+        self.by_slot[obj.entity & EntityIds.SLOT_MASK] = obj
+        return obj
+
+    def get(self, entity):
+        """The object with this handle, or None once its despawn has been flushed."""
+        obj = self.by_slot.get(entity & EntityIds.SLOT_MASK)
+        return obj if obj is not None and obj.entity == entity else None
+
+    def despawn(self, obj):
+        """Queue an object for removal at the next flush(); repeat calls are ignored."""
+        if obj.store_index >= 0:
+            obj.store_index = ~obj.store_index
+            self.queued.append(obj)
+
+    def flush(self):
+        """Swap-remove every queued object; call once per tick."""
+        queued = self.queued
+        if not queued:
+            return
+        items = self.items
+        for obj in queued:
+            index = ~obj.store_index
+            last = items.pop()
+            if last is not obj:
+                items[index] = last
+                # The moved object may be queued itself; keep its mark
+                last.store_index = index if last.store_index >= 0 else ~index
+        self._retire(queued)
+        self.queued = []
+
+    def clear(self):
+        """Remove everything at once, queued or not."""
+        self._retire(self.items)
+        self.items = []
+        self.queued = []
+
+    def _retire(self, objs):
+        by_slot = self.by_slot
+        entities = [obj.entity for obj in objs]
+        for entity in entities:
+            del by_slot[entity & EntityIds.SLOT_MASK]
+        self.ids.free(entities)
+        for obj in objs:
+            obj.store_index = -1
+            if self.on_despawn is not None:
+                self.on_despawn(obj)
+
+# --------------------------------------------------------------------------
+#                                 SYSTEMS
+# --------------------------------------------------------------------------
+#
+# Systems are functions over the live rows of any table that has the
+# components they need; each is a handful of array operations.
+
+def store_previous(table):
+    """Remember where every entity starts the tick, for interpolation."""
+    n = table.count
+    table.prev_x[:n] = table.x[:n]
+    table.prev_y[:n] = table.y[:n]
+
+
+def integrate(table):
+    """Move entities with a velocity by one tick."""
+    table.require(TRANSFORM, VELOCITY)
+    n = table.count
+    table.x[:n] += table.vx[:n]
+    table.y[:n] += table.vy[:n]
+
+
+def knockback(table, speed):
+    """
+    Slide entities being knocked back away at `speed` until their
+    knockback distance is used up. Returns the per-row knocked flags.
+    """
+    table.require(TRANSFORM, KNOCKBACK)
+    n = table.count
+    remaining = table.knockback_dist_remaining[:n]
+    knocked = remaining > 0
+    step = np.where(knocked, np.minimum(speed, remaining), 0.0)
+    table.x[:n] += table.knockback_dx[:n] * step
+    table.y[:n] += table.knockback_dy[:n] * step
+    remaining -= step
+    return knocked
+
+
+def chase(table, target_x, target_y, skip=None):
+    """Walk entities toward a point at their own speed, except rows flagged in `skip`."""
+    table.require(TRANSFORM, CHASE)
+    n = table.count
+    x = table.x[:n]
+    y = table.y[:n]
+    dx = target_x - x
+    dy = target_y - y
+    dist = np.hypot(dx, dy)
+    moving = dist != 0
+    free = np.ones(n, dtype=bool) if skip is None else ~skip
+    chasing = free & moving
+    scale = np.divide(table.speed[:n], dist, out=np.zeros(n), where=chasing)
+    x += dx * scale
+    y += dy * scale
+    facing = table.facing_left[:n]
+    facing[free] = dx[free] < 0
+
+
+def steer_homing(table, homing, targets, strength, retarget):
+    """
+    Turn the `homing` rows of a table toward their target in `targets`
+    (a table with a transform). Rows whose target is gone are first
+    locked on to the row returned by retarget(x, y).
+    """
+    table.require(TRANSFORM, VELOCITY, HOMING)
+    if len(homing) == 0 or not targets.alive[:targets.count].any():
+        return
+    rows = targets.rows_of(table.target[homing])
+    lost = rows < 0
+    if lost.any():
+        rows[lost] = retarget(table.x[homing[lost]], table.y[homing[lost]])
+        table.target[homing[lost]] = targets.entity[rows[lost]]
+
+    dx = targets.x[rows] - table.x[homing]
+    dy = targets.y[rows] - table.y[homing]
+    dist = np.hypot(dx, dy)
+    moving = dist != 0
+    steered = homing[moving]
+    table.vx[steered] += dx[moving] / dist[moving] * strength
+    table.vy[steered] += dy[moving] / dist[moving] * strength
+
+
+def cull(table, bounds):
+    """Kill entities whose position lies outside (left, top, right, bottom)."""
+    table.require(TRANSFORM)
+    n = table.count
+    x = table.x[:n]
+    y = table.y[:n]
+    left, top, right, bottom = bounds
+    outside = (y < top) | (y > bottom) | (x < left) | (x > right)
+    table.alive[:n] &= ~outside
+
+
+def interpolate(table, rows, alpha):
+    """Positions of some rows a fraction `alpha` of the way through the tick."""
+    table.require(TRANSFORM)
+    x = table.x[rows]
+    y = table.y[rows]
+    if alpha != 1.0:
+        prev_x = table.prev_x[rows]
+        prev_y = table.prev_y[rows]
+        x = prev_x + (x - prev_x) * alpha
+        y = prev_y + (y - prev_y) * alpha
+    return x, y
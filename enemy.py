@@ -1,64 +1,245 @@
-import pygame
+import json
 import math
-from app import DEFAULT_ENEMY_SPEED, ENEMY_SCALE_FACTOR, ENEMY_KNOCKBACK_SPEED
+import numpy as np
+from app import DEFAULT_ENEMY_SPEED, ENEMY_KNOCKBACK_SPEED, GRID_CELL_SIZE
+from pool import Pooled
+from spatial import NearestIndex
+from ecs import (Table, TRANSFORM, CHASE, KNOCKBACK, HEALTH,
+                 store_previous, knockback, chase, interpolate)
 
-class Enemy:
-    def __init__(self, game, x, y, enemy_type, enemy_assets, speed=DEFAULT_ENEMY_SPEED):
+class Horde(Table):
+    """
+    Table of every enemy in a game (see ecs.Table): transform, chase,
+    knockback and health columns, one row per enemy. step() moves the
+    whole horde toward the player and applies knockback with the ECS
+    systems, a single array pass instead of a loop per enemy.
+
+    Each enemy's generational entity id stays valid while rows are
+    swapped around, so code holding on to an enemy, such as a homing
+    bullet, can check it is alive in O(1). `members` doubles as the list
+    of enemies in the game: removal is deferred to compact(), so it can
+    be looped over while enemies die.
+    """
+    def __init__(self, ids=None, capacity=256):
+        super().__init__((TRANSFORM, CHASE, KNOCKBACK, HEALTH), ids, capacity)
+        # The Enemy object owning each row
+        self.members = []
+
+        # Nearest-enemy index, rebuilt lazily when positions change
+        self.version = 0
+        self.index = NearestIndex(GRID_CELL_SIZE)
+        self.index_version = -1
+
+    def add(self, enemy, x, y, speed, health):
+        """Give an enemy a fresh row at (x, y) and return (row, entity id)."""
+        row, entity = super().add(x=x, y=y, prev_x=x, prev_y=y, speed=speed, health=health)
+        self.members.append(enemy)
+        self.version += 1
+        return row, entity
+
+    def add_many(self, enemies, columns):
+        """
+        Give a batch of enemies consecutive fresh rows, filled from a dict
+        of column name -> array, and set each enemy's row and entity id.
+        """
+        rows = super().add_many(len(enemies), columns)
+        for enemy, row, entity in zip(enemies, rows.tolist(), self.entity[rows].tolist()):
+            enemy.row = row
+            enemy.entity = entity
+        self.members.extend(enemies)
+        self.version += 1
+
+    def kill(self, enemy):
+        """
+        Flag an enemy's row for removal; its id stops resolving at once.
+        The row and the enemy stay in place until compact() so a dying
+        enemy's position can still be used this tick. Killing an enemy
+        twice is harmless.
+        """
+        super().kill(enemy.row)
+        self.version += 1
+
+    def clear(self):
+        """Drop every row at once, invalidating all outstanding ids."""
+        for enemy in self.members:
+            enemy.release()
+        super().clear()
+        self.members = []
+        self.version += 1
+
+    def compact(self):
+        """Swap-remove every dead row and hand its enemy back to its pool."""
+        dead, holes, moved = super().compact()
+        if len(dead) == 0:
+            return
+        members = self.members
+        for row in dead.tolist():
+            members[row].release()
+        for hole, row in zip(holes.tolist(), moved.tolist()):
+            enemy = members[row]
+            members[hole] = enemy
+            enemy.row = hole
+        del members[self.count:]
+        self.version += 1
+
+    def is_alive(self, entity):
+        return self.rows_of([entity])[0] >= 0
+
+    def nearest_rows(self, qx, qy):
+        """Rows of the live enemies closest to each query point (-1 if none)."""
+        if self.index_version != self.version:
+            rows = np.flatnonzero(self.alive[:self.count])
+            self.index.rebuild(self.x[rows], self.y[rows], rows)
+            self.index_version = self.version
+        return self.index.nearest_many(np.asarray(qx, dtype=float), np.asarray(qy, dtype=float))
+
+    def nearest(self, x, y):
+        """The live enemy closest to (x, y), or None."""
+        row = self.nearest_rows([x], [y])[0]
+        return self.members[row] if row >= 0 else None
+
+    def sprites(self, enemies, alpha=1.0, view=None):
+        """
+        (image, top-left) pairs for a list of live enemies, with their
+        positions interpolated in one array pass. With a view (left, top,
+        right, bottom), enemies whose centre lies outside it are skipped.
+        """
+        n = len(enemies)
+        if n == 0:
+            return []
+        rows = np.fromiter((enemy.row for enemy in enemies), dtype=np.int64, count=n)
+        x, y = interpolate(self, rows, alpha)
+        if view is not None:
+            visible = np.flatnonzero((x >= view[0]) & (x <= view[2]) &
+                                     (y >= view[1]) & (y <= view[3]))
+            if len(visible) < n:
+                enemies = [enemies[i] for i in visible.tolist()]
+                x = x[visible]
+                y = y[visible]
+                if not enemies:
+                    return []
+        images = [enemy.image for enemy in enemies]
+        sizes = np.array([image.get_size() for image in images], dtype=np.int64)
+        left = (x - sizes[:, 0] // 2).tolist()
+        top = (y - sizes[:, 1] // 2).tolist()
+        return list(zip(images, zip(left, top)))
+
+    def far_from(self, x, y, distance):
+        """Per-row flags for enemies further than `distance` from (x, y)."""
+        n = self.count
+        return (self.x[:n] - x)**2 + (self.y[:n] - y)**2 > distance * distance
+
+    def step(self, target_x, target_y):
+        """
+        Advance every enemy one tick: enemies being knocked back slide away
+        at ENEMY_KNOCKBACK_SPEED until the distance is used up, the rest
+        walk toward (target_x, target_y) at their own speed.
+        """
+        if self.count == 0:
+            return
+        store_previous(self)
+        knocked = knockback(self, ENEMY_KNOCKBACK_SPEED)
+        chase(self, target_x, target_y, skip=knocked)
+        self.version += 1
+
+
+def _column(name, moves=False):
+    """
+    Property that reads and writes an enemy's value in its Horde row.
+    Writes to a position column (moves=True) also invalidate the horde's
+    nearest-enemy index.
+    """
+    def get(self):
+        return getattr(self.horde, name)[self.row]
+
+    if moves:
+        def set(self, value):
+            horde = self.horde
+            getattr(horde, name)[self.row] = value
+            horde.version += 1
+    else:
+        def set(self, value):
+            getattr(self.horde, name)[self.row] = value
+
+    return property(get, set)
+
+
+class Enemy(Pooled):
+    """
+    One enemy. Everything shared by its kind (frames, speed, health,
+    armor, scale) lives on its Archetype; an instance only keeps what
+    changes per enemy: its Horde row (position, health...), animation
+    frame and rect.
+    """
+    __slots__ = (
+        "entity", "game", "horde", "row", "archetype",
+        "current_frame", "image", "rect", "dying",
+    )
+
+    # Movement state and health live in the game's Horde arrays
+    x = _column("x", moves=True)
+    y = _column("y", moves=True)
+    speed = _column("speed")
+    knockback_dx = _column("knockback_dx")
+    knockback_dy = _column("knockback_dy")
+    knockback_dist_remaining = _column("knockback_dist_remaining")
+    facing_left = _column("facing_left")
+    health = _column("health")
+
+    def __init__(self, game, x, y, archetype):
+        """
+        Args:
+            game: The game the enemy belongs to
+            x, y: Spawn position
+            archetype: Shared per-kind data (see ArchetypeRegistry)
+        """
         self.game = game
-        self.x = x
-        self.y = y
-        self.speed = speed
-        self.enemy_type = enemy_type
-        
-        # Load image from assets
-        self.frames = enemy_assets[enemy_type]
+        self.horde = game.horde
+        self.row, self.entity = self.horde.add(self, x, y, archetype.speed, archetype.health)
+        self.archetype = archetype
+
         self.current_frame = 0
-        self.image = self.frames[self.current_frame]
-        self.rect = self.image.get_rect(center=(self.x, self.y))
-        
-        # Basic enemy properties
-        self.facing_left = False
-        self.is_boss = (enemy_type == 'boss')
-        self.scale_factor = ENEMY_SCALE_FACTOR if self.is_boss else 1
-        self.health = 10 if self.is_boss else 2
-        self.max_health = self.health
-        
-        # Combat properties
-        self.knockback_dist_remaining = 0
-        self.knockback_dx = 0
-        self.knockback_dy = 0
+        self.image = archetype.frames[self.current_frame]
+        self.rect = self.image.get_rect(center=(x, y))
         self.dying = False
 
+    # Shared data, read through the archetype
+    enemy_type = property(lambda self: self.archetype.name)
+    frames = property(lambda self: self.archetype.frames)
+    is_boss = property(lambda self: self.archetype.is_boss)
+    scale_factor = property(lambda self: self.archetype.scale)
+    max_health = property(lambda self: self.archetype.health)
+    armor = property(lambda self: self.archetype.armor)
+
     def update(self, player=None):
         if self.dying:
             return
+        archetype = self.archetype
             
         # Simple animation - cycle through frames
-        self.current_frame = (self.current_frame + 1) % len(self.frames)
-        self.image = self.frames[self.current_frame]
-        
-        # Apply scaling if needed
-        if self.scale_factor != 1:
-            w = int(self.image.get_width() * self.scale_factor)
-            h = int(self.image.get_height() * self.scale_factor)
-            self.image = pygame.transform.scale(self.image, (w, h))
-            
-        # Flip image if facing left
-        if self.facing_left:
-            self.image = pygame.transform.flip(self.image, True, False)
-            
-        # Update rect position
-        self.rect = self.image.get_rect(center=(self.x, self.y))
+        self.current_frame = (self.current_frame + 1) % archetype.frame_count
+
+        # Pre-scaled, pre-flipped frame from the shared frame table
+        self.image = archetype.frames.get(self.current_frame, bool(self.facing_left), archetype.scale)
+
+        # Update rect in place
+        self.rect.size = self.image.get_size()
+        self.rect.center = (self.x, self.y)
 
     def take_damage(self, amount):
+        """Returns True if this hit killed the enemy."""
+        if self.dying:
+            return False
         self.health -= amount
         if self.health <= 0:
             self.die()
+            return True
+        return False
 
     def die(self):
+        """Mark the enemy dead; the horde drops it at the end of the tick."""
         self.dying = True
-        if self in self.game.enemies:
-            self.game.enemies.remove(self)
+        self.horde.kill(self)
 
     def set_knockback(self, source_x, source_y, distance):
         dx = self.x - source_x
@@ -70,36 +251,123 @@ class Enemy:
             self.knockback_dy = dy / length
             self.knockback_dist_remaining = distance
 
-    def draw(self, surface, offset_x=0, offset_y=0):
+    def draw(self, surface, offset_x=0, offset_y=0, alpha=1.0):
         if not self.dying:
-            pos_x = self.x - offset_x - self.image.get_width() // 2
-            pos_y = self.y - offset_y - self.image.get_height() // 2
-            surface.blit(self.image, (pos_x, pos_y))
+            image, (x, y) = self.horde.sprites([self], alpha)[0]
+            return surface.blit(image, (x + offset_x, y + offset_y))
+
 
+# The subclasses only tell kinds apart (e.g. isinstance(enemy, BossEnemy));
+# their stats come from the archetype table
 
 class FlyingEnemy(Enemy):
-    def __init__(self, game, x, y, enemy_type, enemy_assets, speed=None):
-        if speed is None:
-            speed = DEFAULT_ENEMY_SPEED * 1.5
-        super().__init__(game, x, y, enemy_type, enemy_assets, speed)
-        self.health = 1
-        self.max_health = 1
+    __slots__ = ()
 
 
 class ArmoredEnemy(Enemy):
-    def __init__(self, game, x, y, enemy_type, enemy_assets, speed=None):
-        if speed is None:
-            speed = DEFAULT_ENEMY_SPEED
-        super().__init__(game, x, y, enemy_type, enemy_assets, speed)
-        self.health = 4
-        self.max_health = 4
-        self.armor = 0.5  # 50% damage reduction
+    __slots__ = ()
 
 
 class BossEnemy(Enemy):
-    def __init__(self, game, x, y, enemy_type, enemy_assets, speed=None):
-        if speed is None:
-            speed = DEFAULT_ENEMY_SPEED * 0.75  # Bosses are slower
-        super().__init__(game, x, y, enemy_type, enemy_assets, speed)
-        self.health = 20
-        self.max_health = 20
\ No newline at end of file
+    __slots__ = ()
+
+# --------------------------------------------------------------------------
+#                               ARCHETYPES
+# --------------------------------------------------------------------------
+
+ENEMY_CLASSES = {cls.__name__: cls for cls in (Enemy, FlyingEnemy, ArmoredEnemy, BossEnemy)}
+
+
+class Archetype:
+    """
+    Flyweight holding everything enemies of one kind share, resolved for
+    one boss level. Enemies keep a reference instead of their own copies.
+    """
+    __slots__ = ("name", "level", "cls", "frames", "frame_count", "speed", "health",
+                 "armor", "scale", "is_boss")
+
+    def __init__(self, name, level, cls, frames, speed, health, armor, scale):
+        self.name = name
+        self.level = level
+        self.cls = cls
+        self.frames = frames
+        self.frame_count = len(frames)
+        self.speed = speed
+        self.health = health
+        self.armor = armor
+        self.scale = scale
+        self.is_boss = issubclass(cls, BossEnemy)
+
+    def spawn(self, game, x, y):
+        """A pooled enemy of this kind at (x, y)."""
+        return self.cls.spawn(game, x, y, self)
+
+
+class ArchetypeRegistry:
+    """
+    Enemy kinds loaded from a JSON table (assets/enemies.json). Each entry
+    names its class and frame set and gives its speed (in units of
+    DEFAULT_ENEMY_SPEED), health, armor and scale. A stat is either a
+    number or a curve over the boss level:
+    {"base": b, "per_level": p, "min": lo, "max": hi} gives
+    b + p * level, clamped to [lo, hi].
+    """
+    stats = {"speed": 1, "health": 1, "armor": 0, "scale": 1}
+
+    def __init__(self, specs, enemy_frames):
+        """
+        Args:
+            specs: Archetype name -> table entry
+            enemy_frames: Frame tables by name, i.e. assets["enemies"]
+        """
+        self.specs = specs
+        self.enemy_frames = enemy_frames
+        self.resolved = {}
+        for name, spec in specs.items():
+            if spec.get("class") not in ENEMY_CLASSES:
+                raise ValueError(f"enemy archetype {name!r}: unknown class {spec.get('class')!r}")
+            if spec.get("frames") not in enemy_frames:
+                raise ValueError(f"enemy archetype {name!r}: unknown frames {spec.get('frames')!r}")
+
+    @classmethod
+    def load(cls, path, enemy_frames):
+        with open(path) as f:
+            return cls(json.load(f), enemy_frames)
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    @staticmethod
+    def stat(value, level):
+        if not isinstance(value, dict):
+            return value
+        value_at_level = value.get("base", 0) + value.get("per_level", 0) * level
+        return min(max(value_at_level, value.get("min", -math.inf)), value.get("max", math.inf))
+
+    def set(self, name, stat, value):
+        """Change one stat of an archetype, e.g. for a balance sweep."""
+        if stat not in self.stats:
+            raise ValueError(f"unknown enemy stat {stat!r}")
+        self.specs[name][stat] = value
+        # Enemies already spawned keep the archetype they were built with
+        for key in [key for key in self.resolved if key[0] == name]:
+            del self.resolved[key]
+
+    def get(self, name, level=0):
+        """The archetype `name` at a boss level, built once and then shared."""
+        archetype = self.resolved.get((name, level))
+        if archetype is None:
+            spec = self.specs[name]
+            values = {stat: self.stat(spec.get(stat, default), level)
+                      for stat, default in self.stats.items()}
+            frames = self.enemy_frames[spec["frames"]]
+            # Pre-build this scale now so spawning never transforms images
+            frames.get(0, False, values["scale"])
+            archetype = self.resolved[(name, level)] = Archetype(
+                name, level, ENEMY_CLASSES[spec["class"]], frames,
+                values["speed"] * DEFAULT_ENEMY_SPEED, values["health"],
+                values["armor"], values["scale"])
+        return archetype
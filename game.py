@@ -2,50 +2,156 @@ import pygame
 import random
 import os
 import math
+import time
 import app
 from player import Player
-from enemy import Enemy, FlyingEnemy, ArmoredEnemy, BossEnemy
-from coin import Coin
+from enemy import Horde, ArchetypeRegistry
+from ecs import EntityIds, EntityStore
+from coin import Coin, attract, nearest_coins
+from spatial import SpatialGrid
+from controls import KeyboardInput, ScriptedInput, RecordingInput, ReplayInput
+from profiler import FrameProfiler
+from text import TextCache, HudLabel
+from render import RenderQueue, LAYER_COINS, LAYER_PLAYER, LAYER_BULLETS, LAYER_ENEMIES
+from world import Camera, ChunkedBackground
+import snapshot
+
+# Every upgrade the level-up menu can offer, by name
+UPGRADES = {
+    "Homing Bullets": {"name": "Homing Bullets", "type": "bullet", "desc": "Bullets track enemies"},
+    "Explosive Rounds": {"name": "Explosive Rounds", "type": "bullet", "desc": "Bullets explode on impact"},
+    "Armor Piercing": {"name": "Armor Piercing", "type": "bullet", "desc": "Ignore enemy armor"},
+    "Rapid Fire": {"name": "Rapid Fire", "type": "shoot", "desc": "Double fire rate"},
+    "Health Boost": {"name": "Health Boost", "type": "health", "desc": "+2 Max Health"},
+}
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, script=None, profile_path=None,
+                 dirty_rects=False, record_path=None, replay_path=None):
+        """
+        Args:
+            headless: Use SDL's dummy video driver so no window is opened
+            seed: Seed for the random module, for repeatable runs
+            script: Optional input script (see controls.ScriptedInput)
+                used instead of the keyboard
+            profile_path: If set, frame timings are written to
+                <profile_path>.json/.csv on exit
+            dirty_rects: Redraw and push only the screen regions that
+                changed instead of the whole frame; when the camera moves,
+                the last frame is scrolled and only the strip it uncovers
+                is drawn fresh
+            record_path: If set, the seed and every tick's input are
+                written to this file on exit
+            replay_path: Play back a recording instead of reading input;
+                its seed replaces `seed`
+        """
+        start = time.perf_counter()
+        self.headless = headless
+        self.profiler = FrameProfiler()
+        self.profile_path = profile_path
+
+        # Dirty-rect rendering: regions drawn last frame, to erase and update
+        self.dirty_rects = dirty_rects
+        self.dirty = []
+        self.full_redraw_next = True
+        self.last_view = None
+
+        # Scene and menu frozen into one surface while the game is paused
+        self.paused_frame = None
+        self.render_queue = RenderQueue()
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        # Everything random goes through the global RNG, so a session is
+        # fully determined by its seed and its per-tick input
+        replay = ReplayInput(replay_path) if replay_path else None
+        if replay:
+            seed = replay.seed
+        elif record_path:
+            if seed is None:
+                seed = random.randrange(2**32)
+            # random.seed() ignores the sign of an int seed, so this plays
+            # the same; the recording header stores it unsigned
+            seed = abs(seed)
+            if seed >= 2**64:
+                raise ValueError(f"seed {seed} does not fit in a recording (64 bits at most)")
+        self.seed = seed
+        if seed is not None:
+            random.seed(seed)
+
         pygame.init()
         self.screen = pygame.display.set_mode((app.WIDTH, app.HEIGHT))
         pygame.display.set_caption("meow")
         self.clock = pygame.time.Clock()
 
-        self.enemy_asset_map = {
-            Enemy: "regular",
-            FlyingEnemy: "flying",
-            ArmoredEnemy: "armored",
-            BossEnemy: "boss"
-        }
+        # Dark semi-transparent overlay behind the menus, built once
+        self.dim_overlay = pygame.Surface((app.WIDTH, app.HEIGHT), pygame.SRCALPHA)
+        self.dim_overlay.fill((0, 0, 0, 180))  # Black with 70% opacity
 
+        assets_start = time.perf_counter()
         self.assets = app.load_assets()
+        # Startup timings in ms, reported once the first frame is shown
+        self.startup = {"assets_ms": (time.perf_counter() - assets_start) * 1000}
+        # Shared per-kind enemy data; spawning is a lookup in this table
+        self.archetypes = ArchetypeRegistry.load(app.ENEMY_ARCHETYPES_PATH, self.assets["enemies"])
         self.running = True
         self.game_over = False
-        self.enemies = []
-        self.coins = []
+        if replay:
+            self.input = replay
+        else:
+            self.input = ScriptedInput(self, script) if script else KeyboardInput()
+        self.record_path = record_path
+        if record_path:
+            self.input = RecordingInput(self.input, seed)
+        self.speed = 1.0  # Simulated seconds per real second in run()
+        self.checkpoint = None  # In-memory snapshot: F5 saves, F9 restores
+        # Generational ids shared by every entity table (enemies, bullets, coins)
+        self.entity_ids = EntityIds()
+        self.horde = Horde(self.entity_ids)
+        self.player = None
+        # Collected coins are despawned in bulk at the end of the tick
+        self.coins = EntityStore(self.entity_ids, on_despawn=Coin.release)
+        self.coin_drops = []  # (x, y, value) of this tick's drops
+        self.max_coins = app.MAX_COINS
         self.enemy_spawn_timer = 0
-        self.enemy_spawn_interval = 60
+        self.enemy_spawn_interval = app.ticks(60)
         self.enemies_per_spawn = 1
+        # Spawn odds per enemy type and the upgrades on offer, tunable per
+        # game (see batch.py)
+        self.enemy_spawn_weights = dict(app.ENEMY_SPAWN_WEIGHTS)
+        self.upgrade_pool = list(UPGRADES)
         self.in_level_up_menu = False
         self.upgrade_options = []
         self.enemies_killed = 0
         self.boss_level = 0
         self.current_boss = None
+        self.current_boss_entity = None
         self.screen_shake = 0
         self.screen_shake_offset = [0, 0]
         self.boss_music_playing = False
-
-        font_path = os.path.join("assets", "PressStart2P.ttf")
-        self.font_small = pygame.font.Font(font_path, 18)
-        self.font_large = pygame.font.Font(font_path, 32)
-
-        self.background = self.create_random_background(
-            app.WIDTH, app.HEIGHT, self.assets["floor_tiles"]
-        )
+        self.tick_count = 0
+        self.camera = Camera()
+
+        # Broadphase grids, rebuilt once per tick and shared by collision passes
+        self.enemy_grid = SpatialGrid(app.GRID_CELL_SIZE)
+        self.coin_grid = SpatialGrid(app.GRID_CELL_SIZE)
+
+        # One read of the font file shared by every size
+        fonts = app.load_font("PressStart2P.ttf", (18, 32, 8))
+        self.font_small = fonts[18]
+        self.font_large = fonts[32]
+        self.font_tiny = fonts[8]
+
+        # Rendered text is cached; HUD lines re-render only when their values change
+        self.text_cache = TextCache()
+        self.hud_health = HudLabel(self.text_cache, self.font_small, "Health: {}/{}", (20, 20))
+        self.hud_level = HudLabel(self.text_cache, self.font_small, "Level: {} (XP: {}/{})", (20, 50))
+        self.hud_kills = HudLabel(self.text_cache, self.font_small, "Kills: {}", (20, 80))
+
+        # Floor chunks are rendered on demand as the camera reaches them
+        self.background = ChunkedBackground(self.assets["floor_tiles"], random.getrandbits(32))
         self.reset_game()
+        self.started = start
+        self.startup["init_ms"] = (time.perf_counter() - start) * 1000
 
     def check_for_level_up(self):
         # Calculate the XP needed for next level (same formula you use in draw method)
@@ -61,69 +167,137 @@ class Game:
             
             # Show the level up menu
             self.in_level_up_menu = True
+            self.paused_frame = None
 
     def reset_game(self):
-        self.player = Player(app.WIDTH // 2, app.HEIGHT // 2, self.assets)
-        self.enemies = []
+        self.full_redraw_next = True
+        if self.player is not None:
+            # Retire the old bullets' ids before the player is replaced
+            self.player.bullets.clear()
+        self.player = Player(app.WIDTH // 2, app.HEIGHT // 2, self.assets, self.entity_ids)
+        self.camera.snap(self.player.x, self.player.y)
+        self.horde.clear()
+        # The boss went back to its pool with the rest of the horde
+        self.current_boss = None
+        self.current_boss_entity = None
         self.enemy_spawn_timer = 0
         self.enemies_per_spawn = 1
         
-        self.coins = []
+        self.coins.clear()
+        self.coin_drops = []
         self.game_over = False
 
     
     def spawn_boss(self):
         """Spawns a scaled boss with dramatic effects"""
         # Clear existing enemies
-        self.enemies = [e for e in self.enemies if isinstance(e, BossEnemy)]
+        for enemy in self.enemies:
+            if not enemy.is_boss:
+                enemy.die()
         
-        # Calculate boss stats
-        boss_scale = 1.0 + (self.boss_level * 0.5)
-        health = 10 + (self.boss_level * 5)
-        speed = max(1.0, 2.0 - (self.boss_level * 0.1))
-
-        # Spawn position (top center)
-        x, y = app.WIDTH // 2, -200
-        boss = BossEnemy(
-            self, x, y, "boss", self.assets["enemies"],
-            health=health,
-            speed=speed,
-            scale=boss_scale
-        )
-        self.enemies.append(boss)
+        # Speed, health and scale grow with boss_level (see assets/enemies.json)
+        archetype = self.archetypes.get("summoned_boss", self.boss_level)
+
+        # Spawn position (top center of the view)
+        x, y = self.camera.x + app.WIDTH // 2, self.camera.y - 200
+        boss = archetype.spawn(self, x, y)
         self.current_boss = boss
-        self.screen_shake = 30  # Screen shake effect
+        # Pooled bosses are reused, so the bar follows this spawn's handle
+        self.current_boss_entity = boss.entity
+        self.enemy_grid.rebuild([e for e in self.enemies if not e.dying])
+        self.screen_shake = app.ticks(30)  # Screen shake effect
 
-    def create_random_background(self, width, height, floor_tiles):
-        bg = pygame.Surface((width,height))
-        tile_w = floor_tiles[0].get_width()
-        tile_h = floor_tiles[0].get_height()
+    @property
+    def enemies(self):
+        """Every enemy in the game, in horde row order (see Horde.members)."""
+        return self.horde.members
 
-        for y in range(0, height, tile_h):
-            for x in range(0, width, tile_w):
-                tile = random.choice(floor_tiles)
-                bg.blit(tile, (x, y))
-        
-        return bg
-        
     def run(self):
+        """
+        Main loop with a fixed simulation step. Real time is banked in an
+        accumulator and spent in SIM_RATE ticks (at most MAX_CATCH_UP_STEPS
+        per frame), so slow rendering no longer slows the game down. Each
+        frame is drawn interpolated between the last two ticks.
+        """
+        step = 1.0 / app.SIM_RATE
+        max_steps = math.ceil(app.MAX_CATCH_UP_STEPS * max(self.speed, 1))
+        accumulator = 0.0
+        previous = time.perf_counter()
         while self.running:
             self.clock.tick(app.FPS)
-            self.handle_events()
+            self.profiler.begin_frame()
+            now = time.perf_counter()
+            accumulator += (now - previous) * self.speed
+            previous = now
+
+            steps = 0
+            while accumulator >= step and steps < max_steps and self.running:
+                self.tick()
+                accumulator -= step
+                steps += 1
+            if steps == max_steps:
+                # Too far behind: drop the backlog instead of spiralling
+                accumulator = min(accumulator, step)
+
+            self.draw(alpha=accumulator / step)
+            self.profiler.end_frame()
+
+            if "first_frame_ms" not in self.startup:
+                self.startup["first_frame_ms"] = (time.perf_counter() - self.started) * 1000
+                print("Time to first frame: {first_frame_ms:.0f} ms "
+                      "(assets {assets_ms:.0f} ms, init {init_ms:.0f} ms)".format(**self.startup))
+
+        self.save_profile()
+        self.save_recording()
+        pygame.quit()
 
-            if self.in_level_up_menu:
-                self.draw_upgrade_menu()  # Show the menu when leveling up
-            elif not self.game_over:
-                self.update()
-            
-            self.draw()  # Always draw, but this now includes the menu
+    def save_profile(self):
+        if self.profile_path:
+            self.profiler.dump(self.profile_path)
 
-        pygame.quit()
+    def save_recording(self):
+        if self.record_path:
+            self.input.save(self.record_path)
+
+    def tick(self):
+        """Advance the simulation by one fixed step."""
+        with self.profiler.phase("events"):
+            self.input.advance()
+            if getattr(self.input, "finished", False):
+                # A replay has run out of recorded ticks
+                self.running = False
+                return
+            self.handle_events()
+
+        if not self.in_level_up_menu and not self.game_over:
+            self.update()
+
+    def simulate(self, ticks, stop_at_game_over=True):
+        """
+        Advance the game up to `ticks` fixed steps as fast as the CPU
+        allows, without drawing. Stops early if the game quits or, unless
+        `stop_at_game_over` is False, ends. Returns the number of ticks
+        simulated.
+        """
+        for tick in range(ticks):
+            if not self.running or (stop_at_game_over and self.game_over):
+                return tick
+            self.profiler.begin_frame()
+            self.tick()
+            self.profiler.end_frame()
+        return ticks
 
     def handle_events(self):
-        for event in pygame.event.get():
+        for event in self.input.events():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.toggle_overlay()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                self.checkpoint = snapshot.snapshot(self)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                if self.checkpoint is not None:
+                    snapshot.restore(self, self.checkpoint)
             elif self.in_level_up_menu:  # Only handle upgrade choices
                 if event.type == pygame.KEYDOWN:
                     if event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
@@ -146,7 +320,9 @@ class Game:
                                 self.player.shoot_toward_enemy(nearest_enemy)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:
-                        self.player.shoot_toward_mouse(event.pos)
+                        # Mouse positions are on screen; aim at the world point under it
+                        left, top = self.camera.view()
+                        self.player.shoot_toward_mouse((event.pos[0] + left, event.pos[1] + top))
 
     def update(self):
         # Handle screen shake
@@ -159,67 +335,96 @@ class Game:
         else:
             self.screen_shake_offset = [0, 0]
 
-        # Existing update logic
-        self.player.handle_input()
-        self.player.update(self.enemies)
-
-        for enemy in self.enemies:
-            enemy.update(self.player)
+        # Existing update logic, timed phase by phase
+        phase = self.profiler.phase
+        with phase("input"):
+            self.player.handle_input(self.input.pressed())
+            self.camera.follow(self.player.x, self.player.y)
+        with phase("player_update"):
+            self.player.update(self.horde, self.camera.bounds())
+
+        with phase("enemy_update"):
+            # Move every enemy and apply knockback in one array pass
+            self.horde.step(self.player.x, self.player.y)
+            # Far-away enemies are off screen, so only animate them every few
+            # ticks, staggered by row
+            interval = app.FAR_ENEMY_UPDATE_INTERVAL
+            phase_tick = self.tick_count % interval
+            far = self.horde.far_from(self.player.x, self.player.y, app.FAR_ENEMY_DISTANCE).tolist()
+            for enemy in self.enemies:
+                if far[enemy.row] and enemy.row % interval != phase_tick:
+                    continue
+                enemy.update(self.player)
+            self.enemy_grid.rebuild(self.enemies)
+        self.tick_count += 1
         
-        self.check_player_enemy_collisions()
-        self.check_bullet_enemy_collisions()
-        self.check_player_coin_collisions()
+        with phase("player_enemy"):
+            self.check_player_enemy_collisions()
+        with phase("bullet_enemy"):
+            self.check_bullet_enemy_collisions()
+        with phase("coin_update"):
+            self.spawn_dropped_coins()
+            for coin in self.coins:
+                coin.update()
+            attract(self.coins, self.player.x, self.player.y)
+        with phase("player_coin"):
+            self.check_player_coin_collisions()
+
+        with phase("despawn"):
+            # Drop the enemies that died and the coins collected this tick
+            self.horde.compact()
+            self.coins.flush()
 
         if self.player.health <= 0:
             self.game_over = True
+            self.paused_frame = None
             return
         
-        self.spawn_enemies()
+        with phase("spawning"):
+            self.spawn_enemies()
         self.check_for_level_up()
 
-    def draw_upgrade_menu(self):
-        # Dark semi-transparent overlay
-        overlay = pygame.Surface((app.WIDTH, app.HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # Black with 70% opacity
-        self.screen.blit(overlay, (0, 0))
+    def draw_upgrade_menu(self, surface):
+        """Draw the level-up menu for the current upgrade_options over the dimmed scene."""
         
         # Title
-        title_surf = self.font_large.render("LEVEL UP!", True, (255, 215, 0))  # Gold color
+        text = self.text_cache.render
+        title_surf = text(self.font_large, "LEVEL UP!", (255, 215, 0))  # Gold color
         title_rect = title_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 4))
-        self.screen.blit(title_surf, title_rect)
+        surface.blit(title_surf, title_rect)
         
         # Subtitle
-        subtitle_surf = self.font_small.render(f"Level {self.player.level} Reached", True, (255, 255, 255))
+        subtitle_surf = text(self.font_small, f"Level {self.player.level} Reached")
         subtitle_rect = subtitle_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 4 + 50))
-        self.screen.blit(subtitle_surf, subtitle_rect)
+        surface.blit(subtitle_surf, subtitle_rect)
         
         # Instructions
-        instruction_surf = self.font_small.render("Choose an upgrade (press 1, 2, or 3):", True, (255, 255, 255))
+        instruction_surf = text(self.font_small, "Choose an upgrade (press 1, 2, or 3):")
         instruction_rect = instruction_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 4 + 100))
-        self.screen.blit(instruction_surf, instruction_rect)
+        surface.blit(instruction_surf, instruction_rect)
         
         # List the upgrade options
         y_start = app.HEIGHT // 2 - (len(self.upgrade_options) - 1) * 25
         for i, upgrade in enumerate(self.upgrade_options):
             # Option number (now aligned with name's new position)
-            key_surf = self.font_small.render(f"{i+1}.", True, (255, 215, 0))
+            key_surf = text(self.font_small, f"{i+1}.", (255, 215, 0))
             key_rect = key_surf.get_rect(midright=(app.WIDTH // 2 - 230, y_start + i * 50))
-            self.screen.blit(key_surf, key_rect)
+            surface.blit(key_surf, key_rect)
             
             # Upgrade name (moved further left)
-            name_surf = self.font_small.render(upgrade["name"], True, (255, 255, 255))
+            name_surf = text(self.font_small, upgrade["name"])
             name_rect = name_surf.get_rect(midleft=(app.WIDTH // 2 - 210, y_start + i * 50))
-            self.screen.blit(name_surf, name_rect)
+            surface.blit(name_surf, name_rect)
             
             # Upgrade description (stays in original position)
-            desc_surf = self.font_small.render(upgrade["desc"], True, (200, 200, 200))
+            desc_surf = text(self.font_small, upgrade["desc"], (200, 200, 200))
             desc_rect = desc_surf.get_rect(midleft=(app.WIDTH // 2 + 100, y_start + i * 50))
-            self.screen.blit(desc_surf, desc_rect)
-    
+            surface.blit(desc_surf, desc_rect)
+
     def draw_boss_healthbar(self):
-        """Draws dramatic boss health bar"""
-        if not self.current_boss or self.current_boss not in self.enemies:
-            return
+        """Draws dramatic boss health bar. Returns the rects drawn."""
+        if not self.current_boss or not self.horde.is_alive(self.current_boss_entity):
+            return []
 
         boss = self.current_boss
         bar_width, bar_height = 600, 30
@@ -228,7 +433,7 @@ class Game:
         bar_y = 20
 
         # Background
-        pygame.draw.rect(
+        bar_rect = pygame.draw.rect(
             self.screen, (50, 50, 50),
             (bar_x - border_thickness,
              bar_y - border_thickness,
@@ -261,58 +466,146 @@ class Game:
             )
 
         # Boss level text
-        boss_text = self.font_large.render(
-            f"BOSS LEVEL {self.boss_level}",
-            True, (255, 215, 0))  # Gold color
-        self.screen.blit(
+        boss_text = self.text_cache.render(
+            self.font_large, f"BOSS LEVEL {self.boss_level}",
+            (255, 215, 0))  # Gold color
+        text_rect = self.screen.blit(
             boss_text,
             (app.WIDTH//2 - boss_text.get_width()//2, bar_y - 40)
         )
+        return [bar_rect, text_rect]
+
+    def draw(self, alpha=1.0):
+        """
+        Render the scene.
+
+        Args:
+            alpha: How far between the previous and current tick to draw
+                moving entities (1.0 draws the current tick)
+        """
+        phase = self.profiler.phase
+
+        if self.game_over or self.in_level_up_menu:
+            # Nothing moves while paused, so the scene and menu are composed
+            # once when the menu opens and then shown with a single blit
+            if self.paused_frame is None:
+                self.paused_frame = self.freeze_scene()
+            with phase("ui"):
+                self.screen.blit(self.paused_frame, (0, 0))
+            with phase("flip"):
+                pygame.display.flip()
+            self.full_redraw_next = True
+            return
+        self.paused_frame = None
+
+        # Shake moves every pixel, as does the first frame after a shake, so
+        # those frames are redrawn in full. When the camera moves, the last
+        # frame is scrolled by as much instead of being redrawn
+        shaking = any(self.screen_shake_offset)
+        view = self.camera.view(alpha)
+        full = not self.dirty_rects or shaking or self.full_redraw_next or self.last_view is None
+        scroll = None
+        if not full and view != self.last_view:
+            scroll = (self.last_view[0] - view[0], self.last_view[1] - view[1])
+            if abs(scroll[0]) >= app.WIDTH or abs(scroll[1]) >= app.HEIGHT:
+                full = True
+        self.last_view = view
+        self.full_redraw_next = shaking
+
+        drawn = self.draw_scene(alpha, full, None if full else scroll)
+        with phase("flip"):
+            # A scrolled frame has every pixel moved, so it is pushed whole
+            if full or scroll:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.dirty + drawn)
+        self.dirty = drawn
 
-    def draw(self):
-        # Apply screen shake offset
-        shake_x, shake_y = self.screen_shake_offset
-        self.screen.blit(self.background, (shake_x, shake_y))
+    def draw_scene(self, alpha=1.0, full=True, scroll=None):
+        """
+        Draw the background, entities and HUD to the screen.
 
-        # Draw game elements with offset
-        for coin in self.coins:
-            coin.draw(self.screen, shake_x, shake_y)
+        Args:
+            alpha: Interpolation between the previous and current tick
+            full: Redraw the whole background instead of only erasing the
+                rects drawn last frame
+            scroll: (dx, dy) the view moved by since last frame, in screen
+                pixels; the last frame is scrolled by it before erasing
 
-        if not self.game_over:
-            self.player.draw(self.screen, shake_x, shake_y)
+        Returns the rects drawn.
+        """
+        phase = self.profiler.phase
 
-        for enemy in self.enemies:
-            enemy.draw(self.screen, shake_x, shake_y)
+        # World position of the screen, moved by the screen shake offset
+        shake_x, shake_y = self.screen_shake_offset
+        left, top = self.camera.view(alpha)
+        left -= shake_x
+        top -= shake_y
+        with phase("background"):
+            if full:
+                self.background.draw(self.screen, left, top)
+            else:
+                # Erase only what was drawn last frame
+                erase = self.dirty
+                if scroll is not None:
+                    # Shift the last frame, then erase where its sprites
+                    # moved to and draw the strips it uncovered
+                    dx, dy = scroll
+                    self.screen.scroll(dx, dy)
+                    screen_rect = self.screen.get_rect()
+                    erase = [rect.move(dx, dy).clip(screen_rect) for rect in erase]
+                    width, height = screen_rect.size
+                    if dx:
+                        erase.append(pygame.Rect(0 if dx > 0 else width + dx, 0, abs(dx), height))
+                    if dy:
+                        erase.append(pygame.Rect(0, 0 if dy > 0 else height + dy, width, abs(dy)))
+                for rect in erase:
+                    if rect:
+                        self.background.draw(self.screen, left, top, rect)
+
+        # Queue the sprites in view by layer and draw them in one batch
+        queue = self.render_queue
+        with phase("entities"):
+            margin = app.CULL_MARGIN
+            view = (left - margin, top - margin,
+                    left + app.WIDTH + margin, top + app.HEIGHT + margin)
+            view_rect = pygame.Rect(view[0], view[1], view[2] - view[0], view[3] - view[1])
+            queue.extend(LAYER_COINS, [coin.sprite(alpha) for coin in self.coins
+                                       if view_rect.colliderect(coin.rect)])
+
+            if not self.game_over:
+                queue.add(LAYER_PLAYER, *self.player.sprite(alpha))
+                queue.extend(LAYER_BULLETS, self.player.bullets.sprites(alpha, view=view))
+
+            queue.extend(LAYER_ENEMIES, self.horde.sprites(self.enemies, alpha, view))
+            drawn = queue.flush(self.screen, -left, -top, rects=self.dirty_rects)
 
         # Draw UI elements (not affected by shake)
-        self.draw_ui()
-        self.draw_boss_healthbar()
-
+        with phase("ui"):
+            drawn.extend(self.draw_ui())
+            drawn.extend(self.draw_boss_healthbar())
+        return [rect for rect in drawn if rect]
+
+    def freeze_scene(self):
+        """Draw the current scene with the open menu over it and return a copy."""
+        self.draw_scene()
+        self.screen.blit(self.dim_overlay, (0, 0))
         if self.game_over:
-            self.draw_game_over_screen()
-
-        if self.in_level_up_menu:
-            self.draw_upgrade_menu()
-
-        pygame.display.flip()
+            self.draw_game_over_screen(self.screen)
+        else:
+            self.draw_upgrade_menu(self.screen)
+        return self.screen.copy()
 
-    
     def spawn_enemies(self):
         self.enemy_spawn_timer += 1
         if self.enemy_spawn_timer >= self.enemy_spawn_interval:
             self.enemy_spawn_timer = 0
 
-            enemy_types = [
-                (Enemy, 0.6, "regular"),
-                (FlyingEnemy, 0.25, "flying"),
-                (ArmoredEnemy, 0.1, "armored"), 
-                (BossEnemy, 0.05, "boss")
-            ]
-            
-            # Fixed selection - gets the whole tuple-similar to list,set,dictonary first
-            enemy_class, prob, asset_key = random.choices(
+            # Pick an archetype by its spawn weight
+            enemy_types = list(self.enemy_spawn_weights)
+            kind = random.choices(
                 enemy_types,
-                weights=[et[1] for et in enemy_types]
+                weights=[self.enemy_spawn_weights[name] for name in enemy_types]
             )[0]
 
             side = random.choice(["top", "bottom", "left", "right"])
@@ -329,94 +622,121 @@ class Game:
                 x = app.WIDTH + app.SPAWN_MARGIN
                 y = random.randint(0, app.HEIGHT)
 
-            enemy = enemy_class(self, x, y, asset_key, self.assets["enemies"])
-            self.enemies.append(enemy)
+            # Relative to the view, which follows the player
+            x += self.camera.x
+            y += self.camera.y
 
-    def draw_game_over_screen(self):
-        # Dark overlay
-        overlay = pygame.Surface((app.WIDTH, app.HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+            self.archetypes.get(kind).spawn(self, x, y)
 
+    def draw_game_over_screen(self, surface):
+        """Draw the game-over text over the dimmed scene."""
         # Game Over text
-        game_over_surf = self.font_large.render("GAME OVER!", True, (255, 0, 0))
+        game_over_surf = self.text_cache.render(self.font_large, "GAME OVER!", (255, 0, 0))
         game_over_rect = game_over_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 - 50))
-        self.screen.blit(game_over_surf, game_over_rect)
+        surface.blit(game_over_surf, game_over_rect)
 
         # Prompt to restart or quit
-        prompt_surf = self.font_small.render("Press R to Play Again or ESC to Quit", True, (255, 255, 255))
+        prompt_surf = self.text_cache.render(self.font_small, "Press R to Play Again or ESC to Quit")
         prompt_rect = prompt_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 + 20))
-        self.screen.blit(prompt_surf, prompt_rect)
+        surface.blit(prompt_surf, prompt_rect)
 
     def find_nearest_enemy(self):
-        if not self.enemies:
-            return None
-        nearest = None
-        min_dist = float('inf')
-        px, py = self.player.x, self.player.y
-        for enemy in self.enemies:
-            dist = math.sqrt((enemy.x - px)**2 + (enemy.y - py)**2)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = enemy
-        return nearest
+        # Served by the horde's per-tick nearest-neighbour index
+        return self.horde.nearest(self.player.x, self.player.y)
     
     def check_bullet_enemy_collisions(self):
-        for bullet in self.player.bullets[:]:
-            for enemy in self.enemies[:]:
-                if bullet.rect.colliderect(enemy.rect):
-                    if bullet in self.player.bullets:
-                        self.player.bullets.remove(bullet)
-                    
-                    if hasattr(bullet, 'explode') and not bullet.exploded:
-                        bullet.explode(self)
-                    
-                    if hasattr(enemy, 'take_damage'):
-                        enemy_killed = enemy.take_damage(1)
-                        if enemy_killed:
-                            self.enemies_killed += 1
-                            coins_to_spawn = 1
-                            
-                            if isinstance(enemy, BossEnemy):
-                                coins_to_spawn = 10 + self.boss_level * 5
-                                self.current_boss = None
-                            
-                            # Spawn coins
-                            for _ in range(coins_to_spawn):
-                                self.coins.append(Coin(enemy.x, enemy.y))
-                            
-                            # Spawn boss every 10 kills
-                            if self.enemies_killed % 10 == 0:
-                                self.boss_level = self.enemies_killed // 10
-                                self.spawn_boss()
-                    break
+        bullets = self.player.bullets
+        # Only bullets touching an occupied grid cell need an exact test
+        for i in bullets.candidates(self.enemy_grid):
+            for enemy in self.enemy_grid.query_rect(bullets.rect(i)):
+                if enemy.dying:
+                    continue
+                bullets.kill(i)
+
+                if enemy.take_damage(1):
+                    self.on_enemy_killed(enemy)
+
+                # The blast comes after the direct hit, so each kill is
+                # credited exactly once whichever of the two lands it
+                bullet_type = bullets.type_of(i)
+                if bullet_type.explosion_radius:
+                    bullet_type.explode(self, float(bullets.x[i]), float(bullets.y[i]))
+                break
+
+        # Drop spent bullets in one pass instead of list.remove per hit
+        bullets.compact()
+
+    def on_enemy_killed(self, enemy):
+        """
+        Credit a kill, whatever landed it: count it, drop its coins and
+        summon a boss every 10 kills.
+
+        Args:
+            enemy: The enemy whose take_damage() just returned True
+        """
+        self.enemies_killed += 1
+        coin_value = 1
+
+        if enemy.is_boss:
+            coin_value = 10 + self.boss_level * 5
+            self.current_boss = None
+            self.current_boss_entity = None
+
+        self.drop_coins(enemy.x, enemy.y, coin_value)
+
+        # Spawn boss every 10 kills
+        if self.enemies_killed % 10 == 0:
+            self.boss_level = self.enemies_killed // 10
+            self.spawn_boss()
     
     def check_player_enemy_collisions(self):
-        for enemy in self.enemies[:]:
-            if self.player.rect.colliderect(enemy.rect):
-                self.player.take_damage(1)
-                enemy.set_knockback(self.player.x, self.player.y, app.PUSHBACK_DISTANCE)
+        for enemy in self.enemy_grid.query_rect(self.player.rect):
+            self.player.take_damage(1)
+            enemy.set_knockback(self.player.x, self.player.y, app.PUSHBACK_DISTANCE)
     
-    def check_player_coin_collisions(self):
-        coins_collected = []
-        for coin in self.coins:
-            if coin.rect.colliderect(self.player.rect):
-                coins_collected.append(coin)
-                self.player.add_xp(1)
+    def drop_coins(self, x, y, value):
+        """
+        Drop `value` XP of coins at (x, y) as a single coin. Drops are
+        queued and turned into coins together by spawn_dropped_coins().
+        """
+        self.coin_drops.append((x, y, value))
+
+    def spawn_dropped_coins(self):
+        """
+        Turn the queued drops into coins, finding every drop's nearest coin
+        in one array pass. If a coin already lies within COIN_MERGE_RADIUS,
+        or max_coins are out, a drop's value is added to the nearest coin
+        instead of spawning another.
+        """
+        drops = self.coin_drops
+        if not drops:
+            return
+        self.coin_drops = []
+        coins = self.coins
+        xs, ys, values = zip(*drops)
+        index, distance_sq = nearest_coins(coins, xs, ys)
+        merge_sq = app.COIN_MERGE_RADIUS**2
+        spawned = []  # Coins from earlier drops of this batch
+        for x, y, value, i, best in zip(xs, ys, values, index.tolist(), distance_sq.tolist()):
+            nearest = coins[i] if i >= 0 else None
+            for coin in spawned:
+                d = (coin.x - x)**2 + (coin.ground_y - y)**2
+                if d < best:
+                    nearest, best = coin, d
+            if nearest is not None and (best <= merge_sq or len(coins) >= self.max_coins):
+                nearest.value += value
+            else:
+                spawned.append(coins.add(Coin.spawn(x, y, value)))
 
-        for c in coins_collected:
-            if c in self.coins:
-                self.coins.remove(c)
+    def check_player_coin_collisions(self):
+        self.coin_grid.rebuild(self.coins)
+        for coin in self.coin_grid.query_rect(self.player.rect):
+            self.player.add_xp(coin.value)
+            self.coins.despawn(coin)
 
     def pick_random_upgrades(self, num):
-        possible_upgrades = [
-            {"name": "Homing Bullets", "type": "bullet", "desc": "Bullets track enemies"},
-            {"name": "Explosive Rounds", "type": "bullet", "desc": "Bullets explode on impact"},
-            {"name": "Armor Piercing", "type": "bullet", "desc": "Ignore enemy armor"},
-            {"name": "Rapid Fire", "type": "shoot", "desc": "Double fire rate"},
-            {"name": "Health Boost", "type": "health", "desc": "+2 Max Health"}
-        ]
-        return random.sample(possible_upgrades, k=num)
+        possible_upgrades = [UPGRADES[name] for name in self.upgrade_pool]
+        return random.sample(possible_upgrades, k=min(num, len(possible_upgrades)))
 
     def apply_upgrade(self, player, upgrade):
         name = upgrade["name"]
@@ -433,16 +753,19 @@ class Game:
             player.health += 2
 
     def draw_ui(self):
-        """Draw the player's health, level, and score information."""
+        """Draw the player's health, level, and score information. Returns the rects drawn."""
+        player = self.player
         # Draw player health
-        health_text = self.font_small.render(f"Health: {self.player.health}/{self.player.max_health}", True, (255, 255, 255))
-        self.screen.blit(health_text, (20, 20))
+        rects = [self.hud_health.draw(self.screen, player.health, player.max_health)]
         
         # Draw player level and XP
-        next_level_xp = self.player.level * self.player.level * 5
-        xp_text = self.font_small.render(f"Level: {self.player.level} (XP: {self.player.xp}/{next_level_xp})", True, (255, 255, 255))
-        self.screen.blit(xp_text, (20, 50))
+        next_level_xp = player.level * player.level * 5
+        rects.append(self.hud_level.draw(self.screen, player.level, player.xp, next_level_xp))
         
         # Draw enemies killed count
-        kills_text = self.font_small.render(f"Kills: {self.enemies_killed}", True, (255, 255, 255))
-        self.screen.blit(kills_text, (20, 80))
\ No newline at end of file
+        rects.append(self.hud_kills.draw(self.screen, self.enemies_killed))
+
+        # Frame profiler overlay (toggle with F3)
+        if self.profiler.overlay_visible:
+            rects.extend(self.profiler.draw_overlay(self.screen, self.font_tiny, app.WIDTH - 300, 80))
+        return rects
\ No newline at end of file
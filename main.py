@@ -1,9 +1,66 @@
 # main.py
+import argparse
+import time
+import app
 from game import Game
+from controls import autopilot
+import snapshot
 
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description="Shooter game")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate without a window or drawing, driven by a bot")
+    parser.add_argument("--ticks", type=int, default=app.SIM_RATE * 60,
+                        help="number of ticks to simulate in headless mode")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write frame timings to PATH.json and PATH.csv on exit")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw only the screen regions that changed each frame; "
+                             "camera moves scroll the last frame instead of redrawing it")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the seed and every tick's input to PATH")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="play back a recording (headless: as fast as possible)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="playback speed multiplier when rendering")
+    parser.add_argument("--load", metavar="PATH",
+                        help="start from a snapshot saved with --save")
+    parser.add_argument("--save", metavar="PATH",
+                        help="headless: save a snapshot of the final state to PATH")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        # A recording of a replay would only copy the replay's ticks
+        parser.error("--record and --replay cannot be used together")
+
+    if args.headless:
+        game = Game(headless=True, seed=args.seed, script=autopilot(), profile_path=args.profile,
+                    record_path=args.record, replay_path=args.replay)
+        if args.load:
+            snapshot.load(game, args.load)
+        start = time.perf_counter()
+        if args.replay:
+            # Play the whole recording, through game overs and restarts
+            ticks = game.simulate(game.input.ticks + 1, stop_at_game_over=False) - 1
+        else:
+            ticks = game.simulate(args.ticks)
+        elapsed = time.perf_counter() - start
+        game.save_profile()
+        game.save_recording()
+        if args.save:
+            snapshot.save(game, args.save)
+        print(f"Started in {game.startup['init_ms']:.0f} ms "
+              f"(assets {game.startup['assets_ms']:.0f} ms)")
+        print(f"{ticks} ticks in {elapsed:.2f}s: {ticks / elapsed:.0f} ticks/s "
+              f"({ticks / elapsed / app.SIM_RATE:.0f}x real time)")
+        return
+
+    game = Game(seed=args.seed, profile_path=args.profile, dirty_rects=args.dirty_rects,
+                record_path=args.record, replay_path=args.replay)
+    game.speed = args.speed
+    if args.load:
+        snapshot.load(game, args.load)
     game.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
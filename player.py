@@ -1,18 +1,21 @@
 import pygame
 import app
 import math
-from bullet import Bullet, HomingBullet, ExplosiveBullet  # Fixed import
+from bullet import BulletStore, BULLET_TYPES
 
 class Player:
-    def __init__(self, x, y, assets):
+    def __init__(self, x, y, assets, ids=None):
         self.x = x
         self.y = y
+        # Position at the start of the tick, for render interpolation
+        self.prev_x = x
+        self.prev_y = y
         self.speed = app.PLAYER_SPEED
         self.animations = assets["player"]
         self.state = "idle"
         self.frame_index = 0
         self.animation_timer = 0
-        self.animation_speed = 8
+        self.animation_speed = app.ticks(8)
         self.image = self.animations[self.state][self.frame_index]
         self.rect = self.image.get_rect(center=(self.x, self.y))
         self.facing_left = False
@@ -22,18 +25,25 @@ class Player:
         self.level = 1
         
         # Bullet system attributes
-        self.bullet_speed = 10
-        self.bullet_size = 10
+        self.bullet_speed = 10 * app.TICK_SCALE
+        self.bullet_size = app.BULLET_SIZE
         self.bullet_count = 1
-        self.shoot_cooldown = 20
+        self.shoot_cooldown = app.ticks(20)
         self.shoot_timer = 0
-        self.bullets = []
-        self.special_bullets = []  # Tracks homing/explosive bullets
+        # Bullets draw their ids from the game's shared ecs.EntityIds
+        self.bullets = BulletStore(ids)
         self.bullet_type = "normal"  # normal/homing/explosive
         self.armor_piercing = False
 
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
+    def handle_input(self, keys):
+        """
+        Move the player from the held keys.
+
+        Args:
+            keys: Held-key state indexed by key code, e.g. pygame.key.get_pressed()
+        """
+        self.prev_x = self.x
+        self.prev_y = self.y
         vel_x, vel_y = 0, 0
  
         if keys[pygame.K_LEFT]:
@@ -47,8 +57,6 @@ class Player:
 
         self.x += vel_x
         self.y += vel_y
-        self.x = max(0, min(self.x, app.WIDTH))
-        self.y = max(0, min(self.y, app.HEIGHT))
         self.rect.center = (self.x, self.y)
 
         if vel_x != 0 or vel_y != 0:
@@ -61,27 +69,9 @@ class Player:
         elif vel_x > 0:
             self.facing_left = False
 
-    def update(self, enemies=None):  # Added enemies parameter
-        # Update normal bullets
-        for bullet in self.bullets[:]:
-            if isinstance(bullet, HomingBullet) and enemies:
-                bullet.update(enemies)
-            else:
-                bullet.update()
-                
-            if (bullet.y < 0 or bullet.y > app.HEIGHT or 
-                bullet.x < 0 or bullet.x > app.WIDTH):
-                if bullet in self.bullets:
-                    self.bullets.remove(bullet)
-                if bullet in self.special_bullets:
-                    self.special_bullets.remove(bullet)
-
-        # Update special bullets that need special handling
-        for bullet in self.special_bullets[:]:
-            if isinstance(bullet, ExplosiveBullet) and bullet.exploded:
-                if bullet in self.bullets:
-                    self.bullets.remove(bullet)
-                self.special_bullets.remove(bullet)
+    def update(self, horde=None, bounds=None):
+        # Steer, move and cull all bullets in one vectorized step
+        self.bullets.update(horde, bounds)
 
         # Animation updates
         self.animation_timer += 1
@@ -98,22 +88,34 @@ class Player:
         if self.shoot_timer < self.shoot_cooldown:
             self.shoot_timer += 1
 
-    def draw(self, surface, offset_x=0, offset_y=0):
-    #"""Draw the player character with optional screen shake offset
-    #Args:
-     #   surface: The pygame surface to draw on
-      ## offset_y: Y offset for screen shake effects
-    #"""
-    # Draw player with correct facing direction
-        if self.facing_left:
-            flipped_image = pygame.transform.flip(self.image, True, False)
-            surface.blit(flipped_image, (self.rect.x + offset_x, self.rect.y + offset_y))
-        else:
-            surface.blit(self.image, (self.rect.x + offset_x, self.rect.y + offset_y))
+    def draw(self, surface, offset_x=0, offset_y=0, alpha=1.0):
+        """
+        Draw the player and their bullets with optional screen shake offset.
+        Returns the rects drawn.
+
+        Args:
+            surface: The pygame surface to draw on
+            offset_x, offset_y: Screen shake offsets
+            alpha: Fraction of the way from the previous tick to this one
+        """
+        image, (x, y) = self.sprite(alpha)
+        drawn = [surface.blit(image, (x + offset_x, y + offset_y))]
         
         # Draw all bullets
-        for bullet in self.bullets:
-            bullet.draw(surface, offset_x, offset_y)
+        drawn.extend(self.bullets.draw(surface, offset_x, offset_y, alpha))
+        return drawn
+
+    def sprite(self, alpha=1.0):
+        """(image, top-left) of the player this frame, without the bullets."""
+        # Player with correct facing direction
+        image = self.animations[self.state].get(self.frame_index, self.facing_left)
+        if alpha == 1.0:
+            return image, self.rect.topleft
+        # Interpolate between the previous and current tick
+        rect = self.rect.copy()
+        rect.center = (self.prev_x + (self.x - self.prev_x) * alpha,
+                       self.prev_y + (self.y - self.prev_y) * alpha)
+        return image, rect.topleft
         
     def take_damage(self, amount):
         self.health = max(0, self.health - amount)
@@ -132,22 +134,13 @@ class Player:
         base_angle = math.atan2(dy, dx)
         mid = (self.bullet_count - 1) / 2
 
+        bullet_type = BULLET_TYPES[self.bullet_type]
         for i in range(self.bullet_count):
             offset = i - mid
             angle = base_angle + math.radians(angle_spread * offset)
             vx = math.cos(angle) * self.bullet_speed
             vy = math.sin(angle) * self.bullet_speed
-
-            if self.bullet_type == "homing":
-                bullet = HomingBullet(self.x, self.y, vx, vy, self.bullet_size)
-                self.special_bullets.append(bullet)
-            elif self.bullet_type == "explosive":
-                bullet = ExplosiveBullet(self.x, self.y, vx, vy, self.bullet_size)
-                self.special_bullets.append(bullet)
-            else:
-                bullet = Bullet(self.x, self.y, vx, vy, self.bullet_size)
-            
-            self.bullets.append(bullet)
+            self.bullets.add(self.x, self.y, vx, vy, self.bullet_size, bullet_type)
         
         self.shoot_timer = 0
 
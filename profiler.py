@@ -0,0 +1,142 @@
+import csv
+import json
+import time
+from collections import deque
+
+import app
+
+class PhaseTimer:
+    """Context manager that adds the time spent inside it to one phase."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class FrameProfiler:
+    """
+    Per-phase frame timer. Game code wraps each phase in
+    `with profiler.phase("name"):`; at the end of every frame the phase
+    times are pushed into a ring buffer of the last `history` frames, from
+    which rolling percentiles, the overlay and the exported traces are made.
+    """
+    def __init__(self, history=600, budget_ms=1000 / app.FPS):
+        self.frames = deque(maxlen=history)
+        self.budget = budget_ms / 1000
+        self.phase_names = []
+        self.timers = {}
+        self.current = {}
+        self.frame_start = None
+        self.frame_count = 0
+        self.over_budget = 0
+        self.overlay_visible = False
+
+    def phase(self, name):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = PhaseTimer(self, name)
+            self.phase_names.append(name)
+        return timer
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        total = time.perf_counter() - self.frame_start
+        self.current["frame"] = total
+        self.frames.append(self.current)
+        self.frame_count += 1
+        if total > self.budget:
+            self.over_budget += 1
+        self.frame_start = None
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    # ----------------------------------------------------------------------
+    #                             STATISTICS
+    # ----------------------------------------------------------------------
+
+    @staticmethod
+    def percentiles(values):
+        """Mean and p50/p95/p99 of a list of seconds, in milliseconds."""
+        if not values:
+            return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+        ms = sorted(v * 1000 for v in values)
+        last = len(ms) - 1
+        return {
+            "mean": sum(ms) / len(ms),
+            "p50": ms[int(last * 0.50)],
+            "p95": ms[int(last * 0.95)],
+            "p99": ms[int(last * 0.99)],
+        }
+
+    def phase_times(self, name):
+        return [frame.get(name, 0.0) for frame in self.frames]
+
+    def summary(self):
+        """Rolling statistics over the frames in the ring buffer."""
+        return {
+            "frames": self.frame_count,
+            "window": len(self.frames),
+            "budget_ms": self.budget * 1000,
+            "over_budget": self.over_budget,
+            "over_budget_in_window": sum(1 for f in self.frames if f["frame"] > self.budget),
+            "frame": self.percentiles(self.phase_times("frame")),
+            "phases": {name: self.percentiles(self.phase_times(name))
+                       for name in self.phase_names},
+        }
+
+    # ----------------------------------------------------------------------
+    #                               EXPORT
+    # ----------------------------------------------------------------------
+
+    def dump(self, path):
+        """
+        Write the summary to `<path>.json` and the per-frame trace in the
+        ring buffer to `<path>.csv` (one row per frame, times in ms).
+        """
+        with open(f"{path}.json", "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+        columns = ["frame"] + self.phase_names
+        with open(f"{path}.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["index"] + [f"{name}_ms" for name in columns])
+            first = self.frame_count - len(self.frames)
+            for i, frame in enumerate(self.frames):
+                writer.writerow([first + i] + [f"{frame.get(name, 0.0) * 1000:.4f}"
+                                               for name in columns])
+
+    # ----------------------------------------------------------------------
+    #                               OVERLAY
+    # ----------------------------------------------------------------------
+
+    def draw_overlay(self, surface, font, x, y):
+        """Draw rolling frame and per-phase timings as a text block. Returns the rects drawn."""
+        stats = self.summary()
+        frame = stats["frame"]
+        lines = [
+            f"frame p50 {frame['p50']:.1f} p95 {frame['p95']:.1f} p99 {frame['p99']:.1f}",
+            f"over budget {stats['over_budget']}",
+        ]
+        for name, phase in stats["phases"].items():
+            lines.append(f"{name:<14}{phase['mean']:6.2f}")
+
+        rects = []
+        for i, line in enumerate(lines):
+            text = font.render(line, True, (0, 255, 0))
+            rects.append(surface.blit(text, (x, y + i * (font.get_height() + 2))))
+        return rects
@@ -0,0 +1,61 @@
+# Depth of each entity layer; higher layers are drawn on top
+LAYER_COINS = 0
+LAYER_PLAYER = 1
+LAYER_BULLETS = 2
+LAYER_ENEMIES = 3
+
+class RenderQueue:
+    """
+    Collects (image, position) pairs per depth layer over a frame and
+    submits them all in one blits/fblits call, instead of one blit per
+    entity. Positions are in world coordinates; the screen-shake offset is
+    applied once at flush time.
+    """
+    def __init__(self):
+        self.layers = {}
+
+    def add(self, depth, image, pos):
+        layer = self.layers.get(depth)
+        if layer is None:
+            self.layers[depth] = [(image, pos)]
+        else:
+            layer.append((image, pos))
+
+    def extend(self, depth, sprites):
+        layer = self.layers.get(depth)
+        if layer is None:
+            self.layers[depth] = list(sprites)
+        else:
+            layer.extend(sprites)
+
+    def clear(self):
+        self.layers.clear()
+
+    def __len__(self):
+        return sum(len(layer) for layer in self.layers.values())
+
+    def flush(self, surface, offset_x=0, offset_y=0, rects=False):
+        """
+        Draw every queued sprite, lowest layer first and in insertion order
+        within a layer, then empty the queue.
+
+        Args:
+            surface: The surface to draw on
+            offset_x, offset_y: Screen shake offsets added to every position
+            rects: Return the rects drawn (needed for dirty-rect updates);
+                otherwise the faster fblits is used and nothing is returned
+        """
+        batch = []
+        for depth in sorted(self.layers):
+            batch.extend(self.layers[depth])
+        self.layers.clear()
+
+        if offset_x or offset_y:
+            batch = [(image, (pos[0] + offset_x, pos[1] + offset_y)) for image, pos in batch]
+        if rects:
+            return surface.blits(batch)
+        if hasattr(surface, "fblits"):
+            surface.fblits(batch)
+        else:
+            surface.blits(batch, doreturn=False)
+        return []
@@ -0,0 +1,234 @@
+import json
+import random
+import struct
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+import app
+from coin import Coin
+from pool import pool_for
+
+# --------------------------------------------------------------------------
+#                               FORMAT
+# --------------------------------------------------------------------------
+#
+# A snapshot is a header (magic, format version, length of the JSON
+# metadata), the metadata holding every scalar and the layout of the
+# arrays, then the raw bytes of each array back to back. Entities are
+# stored column by column, never as pickled objects.
+
+SNAPSHOT_MAGIC = b"SGSS"
+SNAPSHOT_VERSION = 5
+SNAPSHOT_HEADER = "<4sHI"
+
+PLAYER_FIELDS = (
+    "x", "y", "prev_x", "prev_y", "speed", "state", "frame_index",
+    "animation_timer", "facing_left", "health", "max_health", "xp", "level",
+    "bullet_speed", "bullet_size", "bullet_count", "shoot_cooldown",
+    "shoot_timer", "bullet_type", "armor_piercing",
+)
+GAME_FIELDS = (
+    "game_over", "in_level_up_menu", "upgrade_options", "enemy_spawn_timer",
+    "enemy_spawn_interval", "enemies_per_spawn", "enemies_killed",
+    "boss_level", "screen_shake", "screen_shake_offset", "tick_count",
+)
+CAMERA_FIELDS = ("x", "y", "prev_x", "prev_y")
+HORDE_COLUMNS = ("x", "y", "prev_x", "prev_y", "speed", "knockback_dx",
+                 "knockback_dy", "knockback_dist_remaining", "facing_left", "health")
+BULLET_COLUMNS = ("x", "y", "prev_x", "prev_y", "vx", "vy", "size", "kind")
+# Per-enemy state that does not live in the Horde arrays; "archetype"
+# indexes the (name, level) list in the metadata
+ENEMY_RECORD = np.dtype([
+    ("archetype", "i2"), ("frame", "i4"), ("dying", "?"),
+    ("rect_x", "i4"), ("rect_y", "i4"),
+])
+COIN_FIELDS = ("x", "y", "prev_x", "prev_y", "velocity_y", "ground_y",
+               "animation_timer", "frame_index", "value", "rect_x", "rect_y")
+COIN_FLOAT_FIELDS = ("x", "y", "prev_x", "prev_y", "velocity_y", "ground_y")
+
+def pack(meta, arrays):
+    """Serialise metadata and a dict of NumPy arrays."""
+    meta = dict(meta, arrays=[(name, array.dtype.descr if array.dtype.names else array.dtype.str,
+                               len(array))
+                              for name, array in arrays.items()])
+    blob = json.dumps(meta).encode()
+    parts = [struct.pack(SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(blob)), blob]
+    parts.extend(np.ascontiguousarray(array).tobytes() for array in arrays.values())
+    return b"".join(parts)
+
+def unpack(data):
+    """Inverse of pack(); the arrays are read-only views into `data`."""
+    magic, version, meta_len = struct.unpack_from(SNAPSHOT_HEADER, data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"not a version {SNAPSHOT_VERSION} snapshot")
+    offset = struct.calcsize(SNAPSHOT_HEADER)
+    meta = json.loads(data[offset:offset + meta_len])
+    offset += meta_len
+    arrays = {}
+    for name, dtype, length in meta.pop("arrays"):
+        dtype = np.dtype([tuple(field) for field in dtype] if isinstance(dtype, list) else dtype)
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=length, offset=offset)
+        offset += dtype.itemsize * length
+    return meta, arrays
+
+# --------------------------------------------------------------------------
+#                           SNAPSHOT / RESTORE
+# --------------------------------------------------------------------------
+
+def snapshot(game):
+    """Return the full simulation state of a game as bytes."""
+    horde = game.horde
+    horde.compact()
+    game.spawn_dropped_coins()
+    bullets = game.player.bullets
+    # Enemies are stored in horde row order, which is also the order of
+    # game.enemies, so a restored horde has the same rows
+    n = horde.count
+    members = horde.members[:n]
+    arrays = {}
+    for name in HORDE_COLUMNS:
+        arrays[f"enemy.{name}"] = getattr(horde, name)[:n]
+    # attrgetter/map keep the per-enemy work in C
+    records = np.zeros(n, dtype=ENEMY_RECORD)
+    if n:
+        # Shared stats are not stored: the archetypes are few and go in meta
+        codes = {}
+        for archetype in map(attrgetter("archetype"), members):
+            if archetype not in codes:
+                codes[archetype] = len(codes)
+        records["archetype"] = list(map(codes.__getitem__, map(attrgetter("archetype"), members)))
+        # Enemies in the horde are alive, so "dying" is left False
+        records["frame"] = np.fromiter(map(attrgetter("current_frame"), members),
+                                       dtype=np.int32, count=n)
+        topleft = np.fromiter(chain.from_iterable(map(attrgetter("rect.topleft"), members)),
+                              dtype=np.int32, count=2 * n).reshape(n, 2)
+        records["rect_x"] = topleft[:, 0]
+        records["rect_y"] = topleft[:, 1]
+    else:
+        codes = {}
+    arrays["enemy.records"] = records
+
+    # Bullet targets are enemy entity ids; store them as horde rows
+    bullets.compact()
+    count = bullets.count
+    for name in BULLET_COLUMNS:
+        arrays[f"bullet.{name}"] = getattr(bullets, name)[:count]
+    arrays["bullet.target"] = horde.rows_of(bullets.target[:count])
+
+    coins = game.coins
+    for name in COIN_FIELDS:
+        if name.startswith("rect_"):
+            attr = name[5:]
+            values = (getattr(c.rect, attr) for c in coins)
+        else:
+            values = (getattr(c, name) for c in coins)
+        dtype = float if name in COIN_FLOAT_FIELDS else np.int32
+        arrays[f"coin.{name}"] = np.fromiter(values, dtype=dtype, count=len(coins))
+
+    version, rng_state, gauss_next = random.getstate()
+    arrays["rng"] = np.array(rng_state, dtype=np.uint32)
+
+    boss = game.current_boss
+    meta = {
+        "game": {name: getattr(game, name) for name in GAME_FIELDS},
+        "player": {name: getattr(game.player, name) for name in PLAYER_FIELDS},
+        "camera": {name: getattr(game.camera, name) for name in CAMERA_FIELDS},
+        "current_boss": (boss.row if boss is not None and horde.is_alive(game.current_boss_entity)
+                         else -1),
+        "archetypes": [[archetype.name, archetype.level] for archetype in codes],
+        "world_seed": game.background.seed,
+        "rng": [version, gauss_next],
+    }
+    return pack(meta, arrays)
+
+def save(game, path):
+    with open(path, "wb") as f:
+        f.write(snapshot(game))
+
+def load(game, path):
+    with open(path, "rb") as f:
+        restore(game, f.read())
+
+def restore(game, data):
+    """Replace the simulation state of a game with a snapshot from snapshot()."""
+    meta, arrays = unpack(data)
+
+    for name, value in meta["game"].items():
+        setattr(game, name, value)
+    game.paused_frame = None
+    game.full_redraw_next = True
+
+    player = game.player
+    for name, value in meta["player"].items():
+        setattr(player, name, value)
+    player.image = player.animations[player.state][player.frame_index]
+    player.rect = player.image.get_rect(center=(player.x, player.y))
+
+    camera = game.camera
+    for name, value in meta["camera"].items():
+        setattr(camera, name, value)
+    if game.background.seed != meta["world_seed"]:
+        game.background.seed = meta["world_seed"]
+        game.background.chunks.clear()
+
+    # Enemies: the horde hands every old one back to its pool in one go;
+    # pooled instances are then filled in directly and their rows added
+    # in one batch
+    horde = game.horde
+    horde.clear()
+    archetypes = [game.archetypes.get(name, level) for name, level in meta["archetypes"]]
+    records = arrays["enemy.records"]
+    members = [pool_for(archetypes[code].cls).acquire_uninitialized()
+               for code in records["archetype"].tolist()]
+    horde.add_many(members, {name: arrays[f"enemy.{name}"] for name in HORDE_COLUMNS})
+    for enemy, code, frame, dying, rect_x, rect_y, facing in zip(
+            members, records["archetype"].tolist(), records["frame"].tolist(),
+            records["dying"].tolist(),
+            records["rect_x"].tolist(), records["rect_y"].tolist(),
+            arrays["enemy.facing_left"].tolist()):
+        archetype = archetypes[code]
+        enemy.game = game
+        enemy.horde = horde
+        enemy.archetype = archetype
+        enemy.current_frame = frame
+        enemy.dying = dying
+        enemy.image = archetype.frames.get(frame, facing, archetype.scale)
+        enemy.rect = enemy.image.get_rect(topleft=(rect_x, rect_y))
+    boss = meta["current_boss"]
+    game.current_boss = members[boss] if boss >= 0 else None
+    game.current_boss_entity = game.current_boss.entity if boss >= 0 else None
+    # Rebuilt by the next update before anything queries it
+    game.enemy_grid.rebuild(())
+
+    # Bullets: the columns are added back in one batch, with homing
+    # targets re-linked through the horde rows the restored horde shares
+    bullets = player.bullets
+    bullets.clear()
+    target = arrays["bullet.target"]
+    columns = {name: arrays[f"bullet.{name}"] for name in BULLET_COLUMNS}
+    columns["target"] = np.where(target >= 0, horde.entity[np.maximum(target, 0)],
+                                 bullets.NO_TARGET)
+    bullets.add_many(len(target), columns)
+
+    # Coins
+    coins = game.coins
+    coins.clear()
+    columns = [arrays[f"coin.{name}"].tolist() for name in COIN_FIELDS]
+    for x, y, prev_x, prev_y, velocity_y, ground_y, timer, frame, value, rect_x, rect_y in zip(*columns):
+        coin = Coin.spawn(x, y, value)
+        coin.x = x
+        coin.y = y
+        coin.prev_x = prev_x
+        coin.prev_y = prev_y
+        coin.velocity_y = velocity_y
+        coin.ground_y = ground_y
+        coin.animation_timer = timer
+        coin.frame_index = frame
+        coin.image = app.coin_frames[frame]
+        coin.rect = coin.image.get_rect(topleft=(rect_x, rect_y))
+        coins.add(coin)
+
+    version, gauss_next = meta["rng"]
+    random.setstate((version, tuple(arrays["rng"].tolist()), gauss_next))
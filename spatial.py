@@ -0,0 +1,174 @@
+import numpy as np
+
+class SpatialGrid:
+    """
+    Uniform grid broadphase. Objects are bucketed into square cells by
+    their rect once per tick, so collision checks only test the objects
+    that share a cell with the query instead of every object in the game.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.objects = []
+
+    def cell_range(self, left, top, right, bottom):
+        """Return the x and y ranges of cells covering the given bounds."""
+        cs = self.cell_size
+        return (range(int(left // cs), int(right // cs) + 1),
+                range(int(top // cs), int(bottom // cs) + 1))
+
+    def rebuild(self, objects):
+        """
+        Re-bucket every object by its current rect.
+
+        Args:
+            objects: Sequence of objects with a `rect` attribute
+        """
+        self.objects = list(objects)
+        self.cells = cells = {}
+        for index, obj in enumerate(self.objects):
+            r = obj.rect
+            xs, ys = self.cell_range(r.left, r.top, r.right - 1, r.bottom - 1)
+            for cx in xs:
+                for cy in ys:
+                    bucket = cells.get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [index]
+                    else:
+                        bucket.append(index)
+
+    def candidates(self, left, top, right, bottom):
+        """Indices of objects in the cells overlapping the bounds, in insertion order."""
+        found = set()
+        cells = self.cells
+        xs, ys = self.cell_range(left, top, right, bottom)
+        for cx in xs:
+            for cy in ys:
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found)
+
+    def query_rect(self, rect):
+        """Return the objects whose rect collides with `rect`."""
+        objects = self.objects
+        return [objects[i]
+                for i in self.candidates(rect.left, rect.top, rect.right - 1, rect.bottom - 1)
+                if objects[i].rect.colliderect(rect)]
+
+    def query_radius(self, x, y, radius):
+        """Return the objects whose centre (x, y) lies within `radius` of a point."""
+        objects = self.objects
+        r2 = radius * radius
+        hits = []
+        for i in self.candidates(x - radius, y - radius, x + radius, y + radius):
+            obj = objects[i]
+            dx = obj.x - x
+            dy = obj.y - y
+            if dx*dx + dy*dy <= r2:
+                hits.append(obj)
+        return hits
+
+
+class NearestIndex:
+    """
+    Uniform grid over a set of points, rebuilt with NumPy from position
+    arrays, answering nearest-neighbour queries. Each query only scans the
+    rings of cells around it until no closer point can exist.
+    """
+    # Below this many points a single vectorized brute-force pass is cheaper
+    BRUTE_FORCE_LIMIT = 64
+    OFFSET = 1 << 20
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.xs = None
+        self.ys = None
+        self.ids = None
+        self.cells = {}
+        self.order = None
+
+    def __len__(self):
+        return 0 if self.xs is None else len(self.xs)
+
+    def key(self, cx, cy):
+        return (cx + self.OFFSET) << 21 | (cy + self.OFFSET)
+
+    def rebuild(self, xs, ys, ids):
+        """
+        Index a new set of points.
+
+        Args:
+            xs, ys: Arrays of point coordinates
+            ids: Array of the id returned for each point
+        """
+        self.xs = xs
+        self.ys = ys
+        self.ids = ids
+        if len(xs) <= self.BRUTE_FORCE_LIMIT:
+            return
+
+        cs = self.cell_size
+        cx = np.floor(xs / cs).astype(np.int64)
+        cy = np.floor(ys / cs).astype(np.int64)
+        self.bounds = (int(cx.min()), int(cy.min()), int(cx.max()), int(cy.max()))
+        keys = self.key(cx, cy)
+        self.order = np.argsort(keys, kind="stable")
+        unique, starts = np.unique(keys[self.order], return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        self.cells = dict(zip(unique.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    def _ring(self, qcx, qcy, r):
+        """Point indices in the square ring of cells at distance r."""
+        cells = self.cells
+        order = self.order
+        found = []
+        for cx in range(qcx - r, qcx + r + 1):
+            edge = cx == qcx - r or cx == qcx + r
+            for cy in (range(qcy - r, qcy + r + 1) if edge else (qcy - r, qcy + r)):
+                span = cells.get(self.key(cx, cy))
+                if span:
+                    found.append(order[span[0]:span[1]])
+        return found
+
+    def nearest(self, x, y):
+        """Return the id of the point closest to (x, y), or -1 if empty."""
+        n = len(self)
+        if n == 0:
+            return -1
+        if n <= self.BRUTE_FORCE_LIMIT:
+            return int(self.ids[np.argmin((self.xs - x)**2 + (self.ys - y)**2)])
+
+        cs = self.cell_size
+        qcx = int(x // cs)
+        qcy = int(y // cs)
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        max_r = max(abs(qcx - min_cx), abs(qcx - max_cx), abs(qcy - min_cy), abs(qcy - max_cy))
+        # Rings closer than the occupied area are empty, so start at its edge
+        min_r = max(min_cx - qcx, qcx - max_cx, min_cy - qcy, qcy - max_cy, 0)
+        best = -1
+        best_d2 = float("inf")
+        for r in range(min_r, max_r + 1):
+            found = self._ring(qcx, qcy, r)
+            if found:
+                candidates = np.concatenate(found)
+                d2 = (self.xs[candidates] - x)**2 + (self.ys[candidates] - y)**2
+                i = int(np.argmin(d2))
+                if d2[i] < best_d2:
+                    best_d2 = float(d2[i])
+                    best = int(candidates[i])
+            # Anything in a further ring is at least r cells away
+            if best >= 0 and best_d2 <= (r * cs) ** 2:
+                break
+        return int(self.ids[best])
+
+    def nearest_many(self, qx, qy):
+        """Batched nearest() for arrays of query points."""
+        n = len(self)
+        if n == 0:
+            return np.full(len(qx), -1, dtype=np.int64)
+        if n <= self.BRUTE_FORCE_LIMIT:
+            d2 = (qx[:, None] - self.xs[None, :])**2 + (qy[:, None] - self.ys[None, :])**2
+            return self.ids[np.argmin(d2, axis=1)]
+        return np.array([self.nearest(x, y) for x, y in zip(qx.tolist(), qy.tolist())],
+                        dtype=np.int64)
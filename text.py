@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+WHITE = (255, 255, 255)
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by (font, text, colour), so
+    a string that is drawn every frame is only rasterised once.
+    """
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, colour=WHITE):
+        key = (font, text, colour)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = self.surfaces[key] = font.render(text, True, colour)
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "surfaces": len(self.surfaces)}
+
+
+class HudLabel:
+    """
+    A line of HUD text at a fixed position. The text is only formatted and
+    rendered again when the values shown in it change.
+    """
+    def __init__(self, cache, font, template, pos, colour=WHITE):
+        """
+        Args:
+            cache: TextCache used to render the text
+            font: pygame font to render with
+            template: str.format template filled with the label's values
+            pos: Top-left screen position
+            colour: Text colour
+        """
+        self.cache = cache
+        self.font = font
+        self.template = template
+        self.pos = pos
+        self.colour = colour
+        self.values = None
+        self.image = None
+
+    def draw(self, surface, *values):
+        """Draw the label showing `values` and return the rect drawn."""
+        if values != self.values:
+            self.values = values
+            self.image = self.cache.render(self.font, self.template.format(*values), self.colour)
+        return surface.blit(self.image, self.pos)
@@ -0,0 +1,113 @@
+import random
+from collections import OrderedDict
+
+import pygame
+
+import app
+
+class Camera:
+    """
+    Screen-sized view into the world, centred on a target (the player)
+    every tick. Like the entities it keeps last tick's position so frames
+    can be drawn interpolated between ticks.
+    """
+    def __init__(self, width=app.WIDTH, height=app.HEIGHT):
+        self.width = width
+        self.height = height
+        self.x = self.y = 0.0
+        self.prev_x = self.prev_y = 0.0
+
+    def snap(self, target_x, target_y):
+        """Centre on a target with no interpolation from the old position."""
+        self.follow(target_x, target_y)
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def follow(self, target_x, target_y):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x = target_x - self.width / 2
+        self.y = target_y - self.height / 2
+
+    def view(self, alpha=1.0):
+        """Integer world position of the screen's top-left corner this frame."""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        return round(x), round(y)
+
+    def bounds(self, margin=0):
+        """World (left, top, right, bottom) seen this tick, grown by `margin`."""
+        return (self.x - margin, self.y - margin,
+                self.x + self.width + margin, self.y + self.height + margin)
+
+
+class ChunkedBackground:
+    """
+    Unbounded floor made of square chunks of random tiles. A chunk is only
+    rendered the first time it comes into view; its tiles are picked by an
+    RNG seeded from (seed, chunk) so it comes back identical after being
+    evicted from the LRU cache, which keeps memory bounded however far the
+    player travels.
+    """
+    def __init__(self, tiles, seed, chunk_size=app.CHUNK_SIZE, capacity=app.CHUNK_CACHE_SIZE):
+        """
+        Args:
+            tiles: Floor tile surfaces, all the same size
+            seed: World seed; the same seed always gives the same floor
+            chunk_size: Side of a chunk in pixels
+            capacity: Most chunks kept rendered at once
+        """
+        self.tiles = tiles
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.capacity = capacity
+        self.chunks = OrderedDict()
+        self.generated = 0
+
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        surf = self.chunks.get(key)
+        if surf is not None:
+            self.chunks.move_to_end(key)
+            return surf
+
+        size = self.chunk_size
+        surf = pygame.Surface((size, size)).convert()
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        tile_w = self.tiles[0].get_width()
+        tile_h = self.tiles[0].get_height()
+        for y in range(0, size, tile_h):
+            for x in range(0, size, tile_w):
+                surf.blit(rng.choice(self.tiles), (x, y))
+
+        self.generated += 1
+        self.chunks[key] = surf
+        if len(self.chunks) > self.capacity:
+            self.chunks.popitem(last=False)
+        return surf
+
+    def draw(self, surface, left, top, area=None):
+        """
+        Draw the floor as seen from the world position (left, top).
+
+        Args:
+            surface: The surface to draw on
+            left, top: World position of the surface's top-left corner
+            area: Optional screen rect to restrict drawing to
+        """
+        if area is None:
+            area = surface.get_rect()
+        cs = self.chunk_size
+        first_cx = (left + area.left) // cs
+        first_cy = (top + area.top) // cs
+        last_cx = (left + area.right - 1) // cs
+        last_cy = (top + area.bottom - 1) // cs
+
+        surface.set_clip(area)
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                surface.blit(self.chunk(cx, cy), (cx * cs - left, cy * cs - top))
+        surface.set_clip(None)
+
+    def stats(self):
+        return {"chunks": len(self.chunks), "generated": self.generated}